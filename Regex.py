@@ -13,69 +13,46 @@ class Regex:
         self.regex = regex_expr
         self.alphabet = string.ascii_letters + string.digits
         self.stack = []
+        # fragments (start state, end state) inside the shared NFA below, operators
+        # only add a constant number of states and epsilon edges to it (Thompson construction)
         self.automata = []
+        self.nfa = NFA(set(), dict(), set(), set(), set())
+        self._state_count = 1
         self.construct_nfa()
 
-    @staticmethod
-    def base_struct(input_symbol):
-        state_1 = 1
-        state_2 = 2
-        basic = NFA(set(), dict(), set(), set(), set())
-        basic.initial_state = state_1
-        basic.final_states.add(state_2)
-
-        basic.add_transition(1, 2, input_symbol)
-        return basic
-
-    @staticmethod
-    def plus_struct(a, b):
-        [a, m1] = a.build_from_number(2)
-        [b, m2] = b.build_from_number(m1)
-        state1 = 1
-        state2 = m2
-        plus = NFA(set(), dict(), set(), set(), set())
-        plus.initial_state = state1
-        plus.final_states.add(state2)
-
-        plus.add_transition(plus.initial_state, a.initial_state, '')
-        plus.add_transition(plus.initial_state, b.initial_state, '')
-        plus.add_transition(list(a.final_states)[0], list(plus.final_states)[0], '')
-        plus.add_transition(list(b.final_states)[0], list(plus.final_states)[0], '')
-        plus.add_transition_dict(a.transitions)
-        plus.add_transition_dict(b.transitions)
-        return plus
-
-    @staticmethod
-    def dot_struct(a, b):
-        [a, m1] = a.build_from_number(1)
-        [b, m2] = b.build_from_number(m1)
-        state1 = 1
-        state2 = m2 - 1
-
-        dot = NFA(set(), dict(), set(), set(), set())
-        dot.initial_state = state1
-        dot.final_states.add(state2)
-
-        dot.add_transition(list(a.final_states)[0], b.initial_state, '')
-        dot.add_transition_dict(a.transitions)
-        dot.add_transition_dict(b.transitions)
-        return dot
-
-    @staticmethod
-    def star_struct(a):
-        [a, m1] = a.build_from_number(2)
-        state1 = 1
-        state2 = m1
-        star = NFA(set(), dict(), set(), set(), set())
-        star.initial_state = state1
-        star.final_states.add(state2)
-
-        star.add_transition(star.initial_state, a.initial_state, '')
-        star.add_transition(star.initial_state, list(star.final_states)[0], '')
-        star.add_transition(list(a.final_states)[0], list(star.final_states)[0], '')
-        star.add_transition(list(a.final_states)[0], a.initial_state, '')
-        star.add_transition_dict(a.transitions)
-        return star
+    def _new_state(self):
+        state = self._state_count
+        self._state_count += 1
+        self.nfa.states.add(state)
+        return state
+
+    def base_struct(self, input_symbol):
+        state_1 = self._new_state()
+        state_2 = self._new_state()
+        self.nfa.add_transition(state_1, state_2, input_symbol)
+        return state_1, state_2
+
+    def plus_struct(self, a, b):
+        start = self._new_state()
+        end = self._new_state()
+        self.nfa.add_transition(start, a[0], '')
+        self.nfa.add_transition(start, b[0], '')
+        self.nfa.add_transition(a[1], end, '')
+        self.nfa.add_transition(b[1], end, '')
+        return start, end
+
+    def dot_struct(self, a, b):
+        self.nfa.add_transition(a[1], b[0], '')
+        return a[0], b[1]
+
+    def star_struct(self, a):
+        start = self._new_state()
+        end = self._new_state()
+        self.nfa.add_transition(start, a[0], '')
+        self.nfa.add_transition(start, end, '')
+        self.nfa.add_transition(a[1], end, '')
+        self.nfa.add_transition(a[1], a[0], '')
+        return start, end
 
     def construct_nfa(self):
         language = set()
@@ -130,7 +107,12 @@ class Regex:
             print(self.automata)
             raise Exception("Regex could not be parsed successfully")
 
-        self.nfa = self.automata.pop()
+        self._finish(self.automata.pop(), language)
+
+    def _finish(self, fragment, language):
+        start, end = fragment
+        self.nfa.initial_state = start
+        self.nfa.final_states = {end}
         self.nfa.inputs = language
 
     def add_operator_to_stack(self, operator):
@@ -187,17 +169,6 @@ states={self.nfa.states}
         return regex_print
 
 
-def convert_transitions_normal_form(transitions: dict):
-    new_transition_dict = dict()
-    for key, val in transitions.items():
-        new_transition_dict.setdefault(key, dict())
-        for _key, _val in val.items():
-            new_dict = {list(_val)[0]: _key}
-            new_transition_dict.get(key).update(new_dict)
-
-    return new_transition_dict
-
-
 def reverse_transition(transitions: dict):
     new_transition_dict = dict()
     for key, val in transitions.items():
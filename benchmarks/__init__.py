@@ -0,0 +1,8 @@
+"""
+benchmarks of the automata operations over seeded random inputs
+
+    python -m benchmarks --output baseline.json
+    python -m benchmarks --compare baseline.json
+
+see benchmarks.runner for the options and benchmarks.generators for the inputs
+"""
@@ -0,0 +1,76 @@
+import random
+
+ALPHABET = 'ab'
+
+
+def random_dfa(num_states: int, alphabet=ALPHABET, final_ratio=0.3, acyclic=False, seed=0):
+    """
+    complete DFA with states 0..num_states - 1 (0 is initial), every transition goes to a
+    uniformly chosen state, with :acyclic only to a higher state or to the last state,
+    a non final sink, so the language is finite
+    """
+    from dfa import DFA
+
+    r = random.Random(seed)
+    sink = num_states - 1
+    transitions = dict()
+    for state in range(num_states):
+        row = transitions[state] = dict()
+        for symbol in alphabet:
+            if not acyclic:
+                row[symbol] = r.randrange(num_states)
+            elif state >= sink - 1:
+                row[symbol] = sink
+            else:
+                row[symbol] = r.randrange(state + 1, num_states)
+
+    final_states = {state for state in range(num_states) if r.random() < final_ratio}
+    if acyclic:
+        final_states.discard(sink)
+    return DFA(set(range(num_states)), set(alphabet), transitions, final_states, 0)
+
+
+def random_nfa(num_states: int, alphabet=ALPHABET, density=1.5, epsilon_ratio=0.1, final_ratio=0.2, seed=0):
+    """
+    NFA with states 0..num_states - 1 (0 is initial), about :density outgoing edges per
+    state and symbol and :epsilon_ratio epsilon edges per state
+    """
+    from nfa import NFA
+
+    r = random.Random(seed)
+    transitions = {state: dict() for state in range(num_states)}
+    for state in range(num_states):
+        for symbol in alphabet:
+            count = int(density) + (r.random() < density % 1)
+            if count:
+                transitions[state][symbol] = {r.randrange(num_states) for _ in range(count)}
+        if r.random() < epsilon_ratio:
+            transitions[state][''] = {r.randrange(num_states)}
+
+    final_states = {state for state in range(num_states) if r.random() < final_ratio} or {num_states - 1}
+    return NFA(set(range(num_states)), transitions, set(alphabet), {0}, final_states)
+
+
+def random_regex(size: int, alphabet=ALPHABET, seed=0) -> str:
+    """ regex in the syntax of Regex with :size symbol occurrences """
+    r = random.Random(seed)
+
+    def build(size):
+        # returns the regex and whether it can be starred without parentheses
+        if size == 1:
+            return r.choice(alphabet), True
+        left = r.randrange(1, size)
+        if r.random() < 0.3:
+            regex, atomic = f'({build(left)[0]}+{build(size - left)[0]})', True
+        else:
+            regex, atomic = build(left)[0] + build(size - left)[0], False
+        if r.random() < 0.2:
+            regex, atomic = (f'{regex}*' if atomic else f'({regex})*'), False
+        return regex, atomic
+
+    return build(size)[0]
+
+
+def random_words(count: int, length: int, alphabet=ALPHABET, seed=0) -> list[str]:
+    r = random.Random(seed)
+    return [''.join(r.choice(alphabet) for _ in range(length)) for _ in range(count)]
@@ -0,0 +1,178 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from benchmarks import generators
+
+# a benchmark is (sizes, setup, run), setup(size, seed) builds the arguments of run outside the timing
+BENCHMARKS = {
+    'accept_input': (
+        (10, 100, 1000),
+        lambda size, seed: (generators.random_dfa(size, seed=seed), generators.random_words(200, 100, seed=seed)),
+        lambda dfa, words: [dfa.accept_input(word) for word in words],
+    ),
+    'minify': (
+        (10, 100, 1000),
+        lambda size, seed: (generators.random_dfa(size, seed=seed),),
+        lambda dfa: dfa.minify(),
+    ),
+    'from_nfa': (
+        # random NFAs determinize to exponentially many states, the sweep stays small
+        (10, 25, 50),
+        lambda size, seed: (generators.random_nfa(size, seed=seed),),
+        lambda nfa: _dfa_class().from_nfa(nfa),
+    ),
+    'from_regex': (
+        (10, 50, 100),
+        lambda size, seed: (generators.random_regex(size, seed=seed),),
+        lambda regex: _dfa_class().from_regex(regex, cache=False),
+    ),
+    'from_regex_glushkov': (
+        (10, 50, 100),
+        lambda size, seed: (generators.random_regex(size, seed=seed),),
+        lambda regex: _dfa_class().from_regex(regex, method='glushkov', cache=False),
+    ),
+    'union': (
+        (10, 30, 100),
+        lambda size, seed: (generators.random_dfa(size, seed=seed), generators.random_dfa(size, seed=seed + 1)),
+        lambda dfa1, dfa2: dfa1.union(dfa2),
+    ),
+    'intersection': (
+        (10, 30, 100),
+        lambda size, seed: (generators.random_dfa(size, seed=seed), generators.random_dfa(size, seed=seed + 1)),
+        lambda dfa1, dfa2: dfa1.intersection(dfa2),
+    ),
+    'difference': (
+        (10, 30, 100),
+        lambda size, seed: (generators.random_dfa(size, seed=seed), generators.random_dfa(size, seed=seed + 1)),
+        lambda dfa1, dfa2: dfa1.difference(dfa2),
+    ),
+    'is_finite': (
+        (10, 100, 1000),
+        lambda size, seed: (generators.random_dfa(size, acyclic=True, seed=seed),),
+        lambda dfa: dfa.is_finite(),
+    ),
+    '__len__': (
+        (10, 100, 1000),
+        lambda size, seed: (generators.random_dfa(size, acyclic=True, seed=seed),),
+        lambda dfa: len(dfa),
+    ),
+    'to_regex': (
+        (5, 10, 20, 40),
+        lambda size, seed: (generators.random_dfa(size, seed=seed),),
+        lambda dfa: dfa.to_regex(dfa),
+    ),
+}
+
+DEFAULT_THRESHOLD = 1.25
+# timings below this (seconds) are mostly noise and never reported as slowdowns
+MIN_TIME = 1e-4
+
+
+def _dfa_class():
+    from dfa import DFA
+
+    return DFA
+
+
+def measure(setup, run, size, seed=0, repeat=5) -> dict:
+    """ min and median wall time of :repeat runs, every run gets fresh arguments from :setup """
+    times = []
+    for _ in range(repeat):
+        args = setup(size, seed)
+        start = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times)}
+
+
+def run_benchmarks(names=None, seed=0, repeat=5, quick=False) -> dict:
+    """
+    {'meta': ..., 'results': {benchmark: {size: {'min': seconds, 'median': seconds}}}},
+    sizes are strings so the result is the same after a JSON round trip,
+    with :quick only the two smallest sizes of every benchmark are run
+    """
+    results = dict()
+    for name in names or BENCHMARKS:
+        sizes, setup, run = BENCHMARKS[name]
+        if quick:
+            sizes = sizes[:2]
+        # one untimed run first, so lazy imports and first-use caches are not measured
+        measure(setup, run, sizes[0], seed, repeat=1)
+        results[name] = {str(size): measure(setup, run, size, seed, repeat) for size in sizes}
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold=DEFAULT_THRESHOLD) -> list[dict]:
+    """
+    benchmarks of :current that are more than :threshold times slower (by min time)
+    than in :baseline, only benchmark and size pairs present in both are compared
+    """
+    slowdowns = []
+    for name, sizes in current['results'].items():
+        for size, timing in sizes.items():
+            before = baseline['results'].get(name, {}).get(size)
+            if before is None or timing['min'] < MIN_TIME:
+                continue
+            ratio = timing['min'] / max(before['min'], MIN_TIME)
+            if ratio > threshold:
+                slowdowns.append({
+                    'benchmark': name, 'size': size, 'baseline': before['min'], 'current': timing['min'], 'ratio': ratio,
+                })
+    return slowdowns
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='times DFA / NFA / regex operations over size sweeps')
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help=f'benchmarks to run, all by default: {", ".join(BENCHMARKS)}')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quick', action='store_true', help='only the two smallest sizes')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='ratio to the baseline time that counts as a slowdown')
+    args = parser.parse_args(argv)
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f'unknown benchmark {name!r}')
+
+    current = run_benchmarks(args.benchmarks, seed=args.seed, repeat=args.repeat, quick=args.quick)
+
+    for name, sizes in current['results'].items():
+        for size, timing in sizes.items():
+            print(f'{name:<22}{size:>8}{timing["min"] * 1000:>12.3f} ms')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        slowdowns = compare(baseline, current, args.threshold)
+        for slowdown in slowdowns:
+            print(
+                f'SLOWER {slowdown["benchmark"]} size={slowdown["size"]}: '
+                f'{slowdown["baseline"] * 1000:.3f} ms -> {slowdown["current"] * 1000:.3f} ms '
+                f'(x{slowdown["ratio"]:.2f})'
+            )
+        if slowdowns:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,432 @@
+import codecs
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+# binary format: header, alphabet (u32 length + utf-8 bytes per symbol), padding to 4 bytes,
+# transition table (little-endian int32, num_states * (num_symbols + 1)), final-state bitmap
+MAGIC = b'CDFA'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHIII')
+
+# codecs where a byte below the limit always decodes to the character of the same code,
+# and is never part of a longer sequence, so bytes can be matched without decoding
+_SINGLE_BYTE_CODECS = {'ascii': 128, 'utf-8': 128, 'iso8859-1': 256}
+
+
+class CompiledDFA:
+    """
+    array-backed form of a DFA
+
+    states are renumbered to dense ints (the initial state is always 0) and
+    input symbols to dense symbol ids, the transition function is stored in one
+    flat table where the next state of `state` on symbol id `sym` is
+    table[state * stride + sym]
+
+    the last column of every row is reserved for symbols outside the alphabet and
+    the last state is the dead state, it stands for the `None` state of DFA.accept_input
+    """
+
+    def __init__(self,
+                 table: array | memoryview,
+                 symbols: tuple,
+                 final_bitmap: bytearray | bytes | memoryview,
+                 state_names: list | None = None):
+        self.table = table
+        self.symbols = symbols
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+        self.unknown_symbol = len(symbols)
+        self.stride = len(symbols) + 1
+        self.num_states = len(table) // self.stride
+        self.initial_state = 0
+        self.dead_state = self.num_states - 1
+        self.final_bitmap = final_bitmap
+        # only kept for debugging, maps int id -> original state name
+        self.state_names = state_names
+        # the buffer `table` and `final_bitmap` point into, and its mmap, when loaded with from_buffer/load
+        self._mapping = None
+        self._file_mapping = None
+
+    @classmethod
+    def from_dfa(cls, dfa) -> 'CompiledDFA':
+        symbols = set(dfa.inputs)
+        for state_transitions in dfa.transitions.values():
+            if state_transitions is not None:
+                symbols.update(state_transitions.keys())
+        symbols = tuple(sorted(symbols, key=str))
+        symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+        stride = len(symbols) + 1
+
+        # renumber in BFS order from the initial state, unreachable states come last
+        state_ids = {dfa.initial_state: 0}
+        state_names = [dfa.initial_state]
+        unreached = iter(dfa.states)
+        rows = []
+        i = 0
+        while i < len(state_names):
+            state = state_names[i]
+            i += 1
+            row = [None] * stride
+            # same rule as DFA._get_next_state, a state outside `states` has no transitions
+            state_transitions = dfa.transitions.get(state) if state in dfa.states else None
+            if state_transitions is not None:
+                for symbol, next_state in state_transitions.items():
+                    if next_state is None:
+                        continue
+                    if next_state not in state_ids:
+                        state_ids[next_state] = len(state_names)
+                        state_names.append(next_state)
+                    row[symbol_ids[symbol]] = state_ids[next_state]
+            rows.append(row)
+
+            if i == len(state_names):
+                for other in unreached:
+                    if other not in state_ids:
+                        state_ids[other] = len(state_names)
+                        state_names.append(other)
+                        break
+
+        dead_state = len(state_names)
+        state_names.append(None)
+        rows.append([None] * stride)
+
+        table = array('i', [dead_state if next_id is None else next_id for row in rows for next_id in row])
+
+        final_bitmap = bytearray((len(state_names) + 7) // 8)
+        for state, state_id in state_ids.items():
+            if state in dfa.final_states:
+                final_bitmap[state_id >> 3] |= 1 << (state_id & 7)
+
+        return cls(table, symbols, final_bitmap, state_names)
+
+    def to_bytes(self) -> bytes:
+        for symbol in self.symbols:
+            if not isinstance(symbol, str):
+                raise ValueError(f'Only str symbols can be saved, got {symbol!r}')
+
+        alphabet = b''.join(
+            struct.pack('<I', len(encoded)) + encoded for encoded in (symbol.encode() for symbol in self.symbols)
+        )
+        table = array('i', self.table)
+        if sys.byteorder != 'little':
+            table.byteswap()
+
+        padding = -(HEADER.size + len(alphabet)) % 4
+        return b''.join((
+            HEADER.pack(MAGIC, FORMAT_VERSION, 0, self.num_states, len(self.symbols), len(alphabet)),
+            alphabet,
+            bytes(padding),
+            table.tobytes(),
+            bytes(self.final_bitmap[:(self.num_states + 7) // 8]),
+        ))
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def from_buffer(cls, buffer) -> 'CompiledDFA':
+        """
+        reads the binary format from :buffer (bytes, mmap, shared memory, ...) without copying,
+        the table and the bitmap stay views into the buffer
+        """
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise ValueError('Not a compiled DFA file')
+        magic, version, _, num_states, num_symbols, alphabet_size = HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError('Not a compiled DFA file')
+
+        symbols = []
+        offset = HEADER.size
+        for _ in range(num_symbols):
+            if len(view) < offset + 4:
+                raise ValueError('Truncated compiled DFA file')
+            (length,) = struct.unpack_from('<I', view, offset)
+            if len(view) < offset + 4 + length:
+                raise ValueError('Truncated compiled DFA file')
+            symbols.append(str(view[offset + 4:offset + 4 + length], 'utf-8'))
+            offset += 4 + length
+        offset += -offset % 4
+
+        table_size = num_states * (num_symbols + 1) * 4
+        if len(view) < offset + table_size + (num_states + 7) // 8:
+            raise ValueError('Truncated compiled DFA file')
+        if sys.byteorder == 'little':
+            table = view[offset:offset + table_size].cast('i')
+        else:
+            table = array('i', view[offset:offset + table_size])
+            table.byteswap()
+        offset += table_size
+        final_bitmap = view[offset:offset + (num_states + 7) // 8]
+
+        compiled = cls(table, tuple(symbols), final_bitmap)
+        compiled._mapping = view
+        return compiled
+
+    @classmethod
+    def load(cls, path) -> 'CompiledDFA':
+        """
+        memory-maps a file written by `save`, nothing is parsed per state, so loading is
+        immediate and processes that load the same file share its pages
+        """
+        with open(path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        compiled = cls.from_buffer(mapping)
+        compiled._file_mapping = mapping
+        return compiled
+
+    def close(self):
+        """ releases the buffer of a loaded table, the object can not be used afterwards """
+        if self._mapping is not None:
+            for view in (self.table, self.final_bitmap, self._mapping):
+                if isinstance(view, memoryview):
+                    view.release()
+            self._mapping = None
+        if self._file_mapping is not None:
+            self._file_mapping.close()
+            self._file_mapping = None
+
+    def is_final(self, state: int) -> bool:
+        return (self.final_bitmap[state >> 3] >> (state & 7)) & 1 == 1
+
+    def next_state(self, state: int, symbol) -> int:
+        return self.table[state * self.stride + self.symbol_ids.get(symbol, self.unknown_symbol)]
+
+    def run(self, input_str, state: int = 0) -> int:
+        """ returns the state reached after reading :input_str from :state """
+        table, stride, symbol_ids, dead = self.table, self.stride, self.symbol_ids, self.dead_state
+        for c in input_str:
+            sym = symbol_ids.get(c)
+            if sym is None:
+                return dead
+            state = table[state * stride + sym]
+            if state == dead:
+                return dead
+        return state
+
+    def accept_input(self, input_str) -> bool:
+        return self.is_final(self.run(input_str))
+
+    def reachable_states(self) -> list[int]:
+        """ states reachable from the initial state over the alphabet, in BFS order """
+        table, stride, num_symbols = self.table, self.stride, len(self.symbols)
+        seen = bytearray(self.num_states)
+        seen[self.initial_state] = 1
+        order = [self.initial_state]
+        for state in order:
+            row = state * stride
+            for next_state in table[row:row + num_symbols]:
+                if not seen[next_state]:
+                    seen[next_state] = 1
+                    order.append(next_state)
+        return order
+
+    def encode(self, input_str, encoding='utf-8') -> array:
+        """
+        maps :input_str to symbol ids, symbols outside the alphabet get `unknown_symbol`,
+        bytes are decoded with :encoding first
+        """
+        if isinstance(input_str, (bytes, bytearray)):
+            input_str = input_str.decode(encoding)
+        symbol_ids, unknown = self.symbol_ids, self.unknown_symbol
+        return array('i', [symbol_ids.get(c, unknown) for c in input_str])
+
+    def run_ids(self, ids, state: int = 0) -> int:
+        """ same as `run` over symbol ids made by `encode` """
+        table, stride, dead = self.table, self.stride, self.dead_state
+        for symbol_id in ids:
+            state = table[state * stride + symbol_id]
+            if state == dead:
+                break
+        return state
+
+    def accept_many(self, strings, lengths=None, encoding='utf-8') -> list[bool]:
+        """
+        accept_input for every string of :strings, one `run` each
+
+        :strings may be strings, bytes (decoded with :encoding) or rows of symbol ids made
+        by `encode` (e.g. a padded 2d array), :lengths gives the real length of every row
+        and is needed when the rows are padded
+        """
+        states = []
+        for i, string in enumerate(strings):
+            if isinstance(string, (bytes, bytearray)):
+                string = string.decode(encoding)
+            if isinstance(string, str):
+                states.append(self.run(string))
+            else:
+                states.append(self.run_ids(string if lengths is None else string[:lengths[i]]))
+
+        final_bitmap = self.final_bitmap
+        return [(final_bitmap[state >> 3] >> (state & 7)) & 1 == 1 for state in states]
+
+    def byte_map(self, encoding='utf-8') -> array | None:
+        """
+        maps every byte value to a symbol id, so raw buffers can be run without decoding,
+        returns None if some symbol is not a single byte in :encoding or if :encoding is not
+        one where every byte below 128 (256 for latin-1) is the character of that code,
+        callers then have to decode
+        """
+        single_byte = _SINGLE_BYTE_CODECS.get(codecs.lookup(encoding).name)
+        if single_byte is None:
+            return None
+        byte_map = array('i', [self.unknown_symbol]) * 256
+        for symbol, symbol_id in self.symbol_ids.items():
+            if not isinstance(symbol, str) or len(symbol) != 1:
+                # can never be read as one character
+                continue
+            if ord(symbol) >= single_byte:
+                return None
+            byte_map[ord(symbol)] = symbol_id
+        return byte_map
+
+    def run_bytes(self, buffer, state: int = 0, byte_map: array = None) -> int:
+        """ same as `run` but over a bytes-like object, nothing is decoded or copied """
+        if byte_map is None:
+            byte_map = self.byte_map()
+        table, stride, dead = self.table, self.stride, self.dead_state
+        with memoryview(buffer) as view:
+            for b in view:
+                state = table[state * stride + byte_map[b]]
+                if state == dead:
+                    break
+        return state
+
+    def match_file(self, path, encoding='utf-8') -> bool:
+        """ whether the whole content of the file is accepted, the file is memory-mapped """
+        byte_map = self.byte_map(encoding)
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return self.is_final(self.initial_state)
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if byte_map is not None:
+                    return self.is_final(self.run_bytes(mm, self.initial_state, byte_map))
+
+                # the alphabet has multibyte symbols, decode the mapping in bounded pieces
+                matcher = StreamMatcher(self, encoding=encoding)
+                with memoryview(mm) as view:
+                    for start in range(0, len(view), mmap.PAGESIZE * 256):
+                        matcher.feed(view[start:start + mmap.PAGESIZE * 256])
+                        if matcher.is_dead():
+                            break
+                return matcher.close()
+
+    def scan_file(self, path, encoding='utf-8') -> list[int]:
+        """
+        matches every line of the file on its own (lines are split on b'\\n', which is
+        not part of the line) and returns the byte offsets of the accepted lines
+        """
+        byte_map = self.byte_map(encoding)
+        accepted = []
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return accepted
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                if codecs.lookup(encoding).name not in _SINGLE_BYTE_CODECS:
+                    # b'\n' may be part of another character, split the decoded text instead
+                    return self._scan_decoded(view, encoding)
+
+                start = 0
+                while start < size:
+                    end = mm.find(b'\n', start)
+                    if end == -1:
+                        end = size
+
+                    if byte_map is not None:
+                        state = self.run_bytes(view[start:end], self.initial_state, byte_map)
+                    else:
+                        state = self.run(str(view[start:end], encoding), self.initial_state)
+
+                    if self.is_final(state):
+                        accepted.append(start)
+                    start = end + 1
+
+        return accepted
+
+    def _scan_decoded(self, view, encoding) -> list[int]:
+        # scan_file for any encoding, byte offsets are counted by encoding the text again
+        decoder = codecs.getincrementaldecoder(encoding)()
+        encoder = codecs.getincrementalencoder(encoding)()
+        accepted = []
+        line_start = offset = 0
+        state = self.initial_state
+        block_size = mmap.PAGESIZE * 256
+        for block_start in range(0, len(view), block_size):
+            text = decoder.decode(view[block_start:block_start + block_size], final=block_start + block_size >= len(view))
+            pieces = text.split('\n')
+            for i, piece in enumerate(pieces):
+                if i > 0:
+                    # the end of a line
+                    if self.is_final(state):
+                        accepted.append(line_start)
+                    offset += len(encoder.encode('\n'))
+                    line_start = offset
+                    state = self.initial_state
+                state = self.run(piece, state)
+                offset += len(encoder.encode(piece))
+
+        # like the byte path, an empty piece after the last newline is not a line
+        if offset > line_start and self.is_final(state):
+            accepted.append(line_start)
+        return accepted
+
+    def state_name(self, state: int):
+        if self.state_names is None:
+            return state
+        return self.state_names[state]
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(states={self.num_states}, symbols={self.symbols!r})'
+
+
+class StreamMatcher:
+    """
+    resumable matcher over a CompiledDFA, input is given in chunks through `feed`
+    and only the current state is kept between calls
+
+    bytes chunks are decoded incrementally with :encoding, so a multibyte
+    character split over two chunks is still read as one symbol
+    """
+
+    def __init__(self, compiled: CompiledDFA, encoding='utf-8'):
+        self.compiled = compiled
+        self.encoding = encoding
+        self.state = compiled.initial_state
+        self._decoder = None
+
+    def feed(self, chunk: str | bytes) -> 'StreamMatcher':
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder(self.encoding)()
+            chunk = self._decoder.decode(chunk)
+
+        self._advance(chunk)
+        return self
+
+    def close(self) -> bool:
+        """ flushes the decoder and returns whether the whole input is accepted """
+        if self._decoder is not None:
+            self._advance(self._decoder.decode(b'', final=True))
+        return self.is_accepted()
+
+    def _advance(self, chunk: str):
+        if chunk and self.state != self.compiled.dead_state:
+            self.state = self.compiled.run(chunk, self.state)
+
+    def is_accepted(self) -> bool:
+        """ whether the input read so far is accepted """
+        return self.compiled.is_final(self.state)
+
+    def is_dead(self) -> bool:
+        """ True when no continuation of the input can be accepted by the table """
+        return self.state == self.compiled.dead_state
+
+    def reset(self):
+        self.state = self.compiled.initial_state
+        self._decoder = None
@@ -1,10 +1,16 @@
-import networkx as nx
+# annotations are not evaluated at runtime, every other module is imported
+# inside the method that needs it so `import dfa` itself stays cheap
+from __future__ import annotations
+
 import exceptions
 from collections import deque
-from typing import Self
-from MinimizationTable import MinimizationTable
-import Regex
-import dfa_to_regex
+
+# only for the annotations, without importing typing
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from compiled_dfa import CompiledDFA, StreamMatcher
+    from dfa_search import Searcher
+    from lazy_product import LazyProductDFA
 
 
 # https://stackoverflow.com/questions/28237955/same-name-for-classmethod-and-instancemethod
@@ -46,23 +52,23 @@ class DFA:
 
     def _get_next_state(self, current_state: str | frozenset, m_input: str):
         if current_state is not None and current_state in self.states:
-            if m_input in self.transitions.get(current_state):
-                return self.transitions.get(current_state).get(m_input)
+            state_transitions = self.transitions.get(current_state)
+            if state_transitions is not None:
+                return state_transitions.get(m_input)
         return None
 
-    def _construct_dfa_graph(self):
-        G = nx.DiGraph()
-        for state in self.states:
-            for alphabet in self.inputs:
-                target_state = self.transitions.get(state)
-                if target_state is not None:
-                    target_state = target_state.get(alphabet)
-                    G.add_edge(state, target_state)
-
-        return G
+    def read_inputs(self, input_str: str | bytes = None, encoding='utf-8') -> StreamMatcher:
+        """
+        returns a streaming matcher, feed it chunks of the input and
+        ask `is_accepted()` at any point, :input_str is fed as the first chunk
+        (compiles the table, see `compile`)
+        """
+        from compiled_dfa import StreamMatcher
 
-    def read_inputs(self, input_str):
-        pass
+        matcher = StreamMatcher(self.compile(), encoding=encoding)
+        if input_str is not None:
+            matcher.feed(input_str)
+        return matcher
 
     def accept_input(self, input_str):
         current_state = self.initial_state
@@ -71,16 +77,78 @@ class DFA:
 
         return current_state in self.final_states
 
+    def compile(self) -> CompiledDFA:
+        """
+        renumbers states and input symbols to dense ints and returns
+        a CompiledDFA with a flat transition table and a final-state bitmap
+
+        the table is not cached, it is a snapshot and would go stale when `states` or
+        `transitions` are changed in place, read_inputs / accept_many / match_file /
+        scan_file build a new one on every call, so for repeated matching keep the
+        result of compile() and call those methods on it instead
+        """
+        from compiled_dfa import CompiledDFA
+
+        return CompiledDFA.from_dfa(self)
+
+    def save(self, path):
+        """ writes the compiled table to :path, load it back with CompiledDFA.load """
+        self.compile().save(path)
+
+    def accept_many(self, strings, lengths=None, encoding='utf-8') -> list[bool]:
+        """
+        same result as calling accept_input on every string, over the compiled table
+        (built on every call, see `compile`), bytes are decoded with :encoding
+        """
+        return self.compile().accept_many(strings, lengths, encoding)
+
+    def match_file(self, path, encoding='utf-8') -> bool:
+        """
+        whether the content of the file at :path is accepted, the file is memory-mapped
+        (compiles the table, see `compile`)
+        """
+        return self.compile().match_file(path, encoding=encoding)
+
+    def match_file_parallel(self, path, encoding='utf-8', workers=None, chunk_size=None) -> bool:
+        """
+        same result as match_file, chunks of the file are run from every state in
+        a process pool and the chunk maps are composed (see parallel_scan)
+        """
+        import parallel_scan
+
+        return parallel_scan.match_file_parallel(self.compile(), path, encoding, workers, chunk_size)
+
+    def scan_file(self, path, encoding='utf-8') -> list[int]:
+        """ returns the byte offsets of the lines of the file that are accepted (compiles the table, see `compile`) """
+        return self.compile().scan_file(path, encoding=encoding)
+
+    def searcher(self) -> Searcher:
+        """ trims, minifies and compiles the DFA for search/finditer once, keep it for repeated searches """
+        from dfa_search import Searcher
+
+        return Searcher(self)
+
+    def search(self, text, mode='leftmost-longest', searcher=None) -> tuple[int, int] | None:
+        """
+        (start, end) of the first match inside :text, None if there is none,
+        builds a Searcher on every call unless :searcher (from `searcher`) is given
+        """
+        return (searcher or self.searcher()).search(text, mode)
+
+    def finditer(self, text, mode='leftmost-longest', searcher=None):
+        """
+        yields the (start, end) spans of the matches inside :text,
+        mode is 'leftmost-longest' (non-overlapping) or 'all-ends' (see Searcher.finditer),
+        builds a Searcher on every call unless :searcher (from `searcher`) is given
+        """
+        return (searcher or self.searcher()).finditer(text, mode)
+
     def compute_reachable_states(self):
         visited_state = {self.initial_state}
-        states = [self.initial_state]
+        states = deque([self.initial_state])
 
-        while len(states) > 0:
-            try:
-                state = states[0]
-                states.pop(0)
-            except IndexError:
-                break
+        while states:
+            state = states.popleft()
 
             if self.transitions.get(state) is not None:
                 for next_state in self.transitions.get(state).values():
@@ -90,84 +158,77 @@ class DFA:
 
         return visited_state
 
+    def trim(self) -> DFA:
+        """
+        DFA of the same language that only keeps the useful states: reachable from the
+        initial state (BFS) and able to reach a final state (BFS over a reverse-edge index),
+        transitions into removed states are left out like missing transitions,
+        the initial state is always kept
+        """
+        import dfa_analysis
+
+        useful = dfa_analysis.useful_states(self)
+        states = useful | {self.initial_state}
+        return self.__class__(
+            states=states,
+            inputs=set(self.inputs),
+            transitions={
+                state: {
+                    symbol: next_state
+                    for symbol, next_state in dfa_analysis.successors(self, state) if next_state in useful
+                }
+                for state in states
+            },
+            final_states=set(self.final_states) & useful,
+            initial_state=self.initial_state
+        )
+
     def is_empty(self):
         return len(self.compute_reachable_states() & self.final_states) == 0
 
     def is_finite(self):
-        # check that if there is loop or cycle in DFA
-        # if there is a loop/cycle the language is infinite otherwise it's finite
-        dfa_graph = self._construct_dfa_graph()
-        try:
-            res = nx.find_cycle(dfa_graph, orientation='original')
-            return False
-        except nx.NetworkXNoCycle:
-            return True
+        # the language is infinite iff a cycle can be reached from the initial
+        # state and can itself reach a final state
+        import dfa_analysis
 
-    def __len__(self):
-        if self.is_finite() and not self.is_empty():
-            maximum_word_length = self.longest_word_length()
-            if maximum_word_length:
-                smallest_word_length = self.shortest_word_length()
-                dfa_graph = self._construct_dfa_graph()
-                count = 0
-                for word_length in range(smallest_word_length, maximum_word_length + 1):
-                    for final_state in self.final_states:
-                        paths = nx.all_simple_paths(dfa_graph, self.initial_state, final_state)
-
-                        for path in paths:
-                            if len(path) == word_length:
-                                count += 1
-
-                return count
+        return dfa_analysis.is_finite(self)
 
-            else:
-                raise exceptions.InfiniteFiniteException('The DFA Language is finite, but it accepts infinite strings')
-        else:
-            raise exceptions.InfiniteLanguageException('The Language accepted by DFA is infinite')
+    def word_counts(self) -> dict[int, int]:
+        """
+        {length: number of accepted words of that length}
+        raises InfiniteLanguageException if the language is infinite
+        """
+        import dfa_analysis
 
-    def shortest_word_length(self):
-        dfa_graph = self._construct_dfa_graph()
-        shortest_path = []
-        for final_state in self.final_states:
+        return dfa_analysis.count_words_by_length(self)
 
-            try:
-                path_length = nx.shortest_path_length(dfa_graph, self.initial_state, final_state)
-                shortest_path.append(path_length)
+    def cardinality(self) -> int:
+        """ number of accepted words, unlike len() it is not limited to sys.maxsize """
+        return sum(self.word_counts().values())
 
-            except nx.NetworkXNoPath:
-                print(f'Path from {self.initial_state} -> {final_state} is not Found!')
-                pass
+    def __len__(self):
+        return self.cardinality()
 
-            except nx.NodeNotFound:
-                print('node are not added properly to graph')
-                pass
+    def shortest_word_length(self):
+        import dfa_analysis
 
-        return min(shortest_path)
+        return dfa_analysis.shortest_word_length(self)
 
     def longest_word_length(self):
-        if self.is_finite():
-            dfa_graph = self._construct_dfa_graph()
-            longest_path = []
-            for final_state in self.final_states:
-
-                try:
-                    try:
-                        path_length = nx.dag_longest_path_length(dfa_graph, self.initial_state, final_state)
-                        longest_path.append(path_length)
-                    except:
-                        longest_path.append(
-                            len(list(nx.all_simple_paths(dfa_graph, self.initial_state, final_state))[0])
-                        )
-
-                except nx.NetworkXNoPath:
-                    print(f'Path from {self.initial_state} -> {final_state} is not Found!')
-                    pass
-
-                except nx.NodeNotFound:
-                    print('node are not added properly to graph')
-                    pass
-
-            return max(longest_path)
+        # None when the language is infinite
+        import dfa_analysis
+
+        return dfa_analysis.longest_word_length(self)
+
+    def copy(self) -> DFA:
+        """ copy whose states, transitions and final states can be changed independently """
+        return self.__class__(
+            states=set(self.states),
+            inputs=set(self.inputs),
+            transitions={state: dict(state_transitions) for state, state_transitions in self.transitions.items()},
+            final_states=set(self.final_states),
+            initial_state=self.initial_state
+        )
 
     def complement(self):
         # we need to just convert final states to normal states and vise versa
@@ -188,6 +249,10 @@ class DFA:
         if self_dfa.inputs != other_dfa.inputs:
             raise exceptions.SymbolMisMatchException('The Input Symbols are not Equal!')
 
+        # states that can never accept behave like a missing transition, dropping them
+        # first keeps them out of the product, the languages of the operands are unchanged
+        self_dfa, other_dfa = self_dfa.trim(), other_dfa.trim()
+
         new_initial_state = (self_dfa.initial_state, other_dfa.initial_state)
         new_transitions = {}
         new_states = set()
@@ -211,8 +276,9 @@ class DFA:
             """
 
             state_1, state_2 = curr_state
-            transition_1 = self_dfa.transitions.get(state_1)  # {0: 'q1', 1: 'q2' }
-            transition_2 = other_dfa.transitions.get(state_2)  # {0: 'q5', 1: 'q6' }
+            # a missing transition (the None state) has no transitions of its own
+            transition_1 = self_dfa.transitions.get(state_1) or {}  # {0: 'q1', 1: 'q2' }
+            transition_2 = other_dfa.transitions.get(state_2) or {}  # {0: 'q5', 1: 'q6' }
 
             for c in self_dfa.inputs:
                 # result of transition_1 and transition_2 over alphabet(input alphabets)
@@ -226,7 +292,11 @@ class DFA:
         return new_initial_state, new_states, new_transitions
 
     @hybridmethod
-    def union(cls, dfa1: Self, dfa2: Self) -> Self:
+    def union(cls, dfa1: DFA, dfa2: DFA, lazy=False, cache_size=None) -> DFA | LazyProductDFA:
+        if lazy:
+            from lazy_product import LazyProductDFA
+
+            return LazyProductDFA(dfa1, dfa2, LazyProductDFA.UNION, cache_size=cache_size)
 
         new_initial_state, new_states, new_transitions = DFA._construct_new_state_transitions(dfa1, dfa2)
 
@@ -244,11 +314,16 @@ class DFA:
         )
 
     @union.instancemethod
-    def union(self, other_dfa) -> Self:
+    def union(self, other_dfa, lazy=False, cache_size=None) -> DFA | LazyProductDFA:
         """
         param other_dfa: refer to another DFA class
+        param lazy: return a LazyProductDFA that builds product states only when visited
         :return: returns the union of passed DFA with current DFA
         """
+        if lazy:
+            from lazy_product import LazyProductDFA
+
+            return LazyProductDFA(self, other_dfa, LazyProductDFA.UNION, cache_size=cache_size)
 
         new_initial_state, new_states, new_transitions = self._construct_new_state_transitions(self, other_dfa)
 
@@ -271,7 +346,12 @@ class DFA:
         )
 
     @hybridmethod
-    def intersection(cls, dfa1: Self, dfa2: Self) -> Self:
+    def intersection(cls, dfa1: DFA, dfa2: DFA, lazy=False, cache_size=None) -> DFA | LazyProductDFA:
+        if lazy:
+            from lazy_product import LazyProductDFA
+
+            return LazyProductDFA(dfa1, dfa2, LazyProductDFA.INTERSECTION, cache_size=cache_size)
+
         new_initial_state, new_states, new_transitions = cls._construct_new_state_transitions(dfa1, dfa2)
         new_final_states = set()
 
@@ -293,7 +373,11 @@ class DFA:
         )
 
     @intersection.instancemethod
-    def intersection(self, other_dfa: Self) -> Self:
+    def intersection(self, other_dfa: DFA, lazy=False, cache_size=None) -> DFA | LazyProductDFA:
+        if lazy:
+            from lazy_product import LazyProductDFA
+
+            return LazyProductDFA(self, other_dfa, LazyProductDFA.INTERSECTION, cache_size=cache_size)
 
         new_initial_state, new_states, new_transitions = self._construct_new_state_transitions(self, other_dfa)
 
@@ -311,10 +395,15 @@ class DFA:
         )
 
     @hybridmethod
-    def difference(cls, dfa1: Self, dfa2: Self) -> Self:
+    def difference(cls, dfa1: DFA, dfa2: DFA, lazy=False, cache_size=None) -> DFA | LazyProductDFA:
         """
         calculation -> dfa1 - dfa2
         """
+        if lazy:
+            from lazy_product import LazyProductDFA
+
+            return LazyProductDFA(dfa1, dfa2, LazyProductDFA.DIFFERENCE, cache_size=cache_size)
+
         new_initial_state, new_states, new_transitions = cls._construct_new_state_transitions(dfa1, dfa2)
         new_final_states = set()
 
@@ -336,12 +425,16 @@ class DFA:
         )
 
     @difference.instancemethod
-    def difference(self, other_dfa: Self) -> Self:
+    def difference(self, other_dfa: DFA, lazy=False, cache_size=None) -> DFA | LazyProductDFA:
         """
         It does the calculation by -> self - other_dfa
 
-        :return: DFA class
+        :return: DFA class, or a LazyProductDFA if :lazy
         """
+        if lazy:
+            from lazy_product import LazyProductDFA
+
+            return LazyProductDFA(self, other_dfa, LazyProductDFA.DIFFERENCE, cache_size=cache_size)
         new_initial_state, new_states, new_transitions = self._construct_new_state_transitions(self, other_dfa)
         new_final_states = set()
 
@@ -358,170 +451,156 @@ class DFA:
         )
 
     @hybridmethod
-    def is_subset(cls, dfa1: Self, dfa2: Self) -> bool:
+    def is_subset(cls, dfa1: DFA, dfa2: DFA) -> bool:
         """
         dfa1 is subset of dfa2
         dfa1 - dfa2 = 0 then dfa1 is subset of dfa2 otherwise False
         """
-        new_initial_state, new_states, new_transitions = cls._construct_new_state_transitions(dfa1, dfa2)
-        new_final_states = set()
-
-        for state_1, state_2 in new_states:
-            if state_1 in dfa1.final_states and state_2 not in dfa2.final_states:
-                new_final_states.add((state_1, state_2))
-
-        return len(new_final_states) == 0
+        return cls.subset_counterexample(dfa1, dfa2) is None
 
     @is_subset.instancemethod
-    def is_subset(self, other_dfa: Self) -> bool:
+    def is_subset(self, other_dfa: DFA) -> bool:
         """
         is self subset of other_dfa
         self - other_dfa = empty -> self is subset of other_dfa else False
         """
-        new_initial_state, new_states, new_transitions = self._construct_new_state_transitions(self, other_dfa)
+        return self.__class__.subset_counterexample(self, other_dfa) is None
 
-        new_final_states = set()
-        for state_1, state_2 in new_states:
-            if state_1 in self.final_states and state_2 not in other_dfa.final_states:
-                new_final_states.add((state_1, state_2))
+    @hybridmethod
+    def subset_counterexample(cls, dfa1: DFA, dfa2: DFA) -> str | None:
+        """
+        shortest word accepted by dfa1 but not by dfa2, None if dfa1 is subset of dfa2
+        the product is searched lazily and the search stops at the first such word
+        """
+        from lazy_product import LazyProductDFA
 
-        return len(new_final_states) == 0
+        return LazyProductDFA(dfa1, dfa2, LazyProductDFA.DIFFERENCE, cache_size=0).shortest_accepted_word()
+
+    @subset_counterexample.instancemethod
+    def subset_counterexample(self, other_dfa: DFA) -> str | None:
+        return self.__class__.subset_counterexample(self, other_dfa)
 
     @hybridmethod
-    def is_disjoint(cls, dfa1: Self, dfa2: Self) -> bool:
-        return len(cls.intersection(dfa1, dfa2).final_states) == 0
+    def is_disjoint(cls, dfa1: DFA, dfa2: DFA) -> bool:
+        return cls.disjoint_witness(dfa1, dfa2) is None
 
     @is_disjoint.instancemethod
-    def is_disjoint(self, other_dfa: Self) -> bool:
+    def is_disjoint(self, other_dfa: DFA) -> bool:
         """
-        if self.intersection(self, other_dfa).final_states == empty set then 2 language are disjoint
+        if no word is accepted by both self and other_dfa then 2 language are disjoint
         """
-        return len(self.intersection(other_dfa).final_states) == 0
-
-    def minify(self, retain_names=True) -> Self:
-        # we use table algorithm to find the minimized DFA (Myhill Nerode Theorem)
-        mt = MinimizationTable(self.states)
+        return self.__class__.disjoint_witness(self, other_dfa) is None
 
-        while not mt == MinimizationTable(self.states, create_from_table=True, table_data=mt.table_back_map):
-            mt.save_current_table_into_back_map()
-            for pair in mt.keys():
-                state_1, state_2 = pair
-                state_1_final = state_1 in self.final_states
-                state_2_final = state_2 in self.final_states
+    @hybridmethod
+    def disjoint_witness(cls, dfa1: DFA, dfa2: DFA) -> str | None:
+        """
+        shortest word accepted by both DFAs, None if their languages are disjoint
+        the product is searched lazily and the search stops at the first such word
+        """
+        from lazy_product import LazyProductDFA
 
-                if state_1_final ^ state_2_final:
-                    mt.update_table(pair)
-                    continue
+        return LazyProductDFA(dfa1, dfa2, LazyProductDFA.INTERSECTION, cache_size=0).shortest_accepted_word()
 
-                for symbol in self.inputs:
-                    try:
-                        tr_state_1, tr_state_2 = self.transitions.get(state_1).get(symbol), \
-                                                 self.transitions.get(state_2).get(symbol)
+    @disjoint_witness.instancemethod
+    def disjoint_witness(self, other_dfa: DFA) -> str | None:
+        return self.__class__.disjoint_witness(self, other_dfa)
 
-                        if mt.is_checked((tr_state_1, tr_state_2), value=True):
-                            mt.update_table((state_1, state_2), value=True)
+    def minify(self, retain_names=True) -> DFA:
+        """
+        minimal DFA of the reachable part of this DFA (Hopcroft's algorithm)
 
-                    except exceptions.ElementNotInTable:
-                        pass
+        with :retain_names the new states are frozensets of the merged states,
+        otherwise they are numbered from 0 (the initial state) in BFS order
+        """
+        import hopcroft
+
+        compiled = self.compile()
+        blocks = hopcroft.refine_partition(compiled, compiled.reachable_states())
+
+        block_of = dict()
+        for index, block in enumerate(blocks):
+            for state in block:
+                block_of[state] = index
+
+        dead = compiled.dead_state
+        # a block holding only the dead state stands for missing transitions
+        dead_block = block_of.get(dead)
+        if dead_block is not None and len(blocks[dead_block]) > 1:
+            dead_block = None
+
+        # number the blocks in BFS order starting from the initial block
+        table, stride = compiled.table, compiled.stride
+        initial_block = block_of[compiled.initial_state]
+        block_order = [initial_block]
+        block_ids = {initial_block: 0}
+        for index in block_order:
+            row = next(iter(blocks[index])) * stride
+            for symbol_id in range(len(compiled.symbols)):
+                next_block = block_of[table[row + symbol_id]]
+                if next_block != dead_block and next_block not in block_ids:
+                    block_ids[next_block] = len(block_order)
+                    block_order.append(next_block)
 
-        filtered_data = mt.filter_item_by_value(value=False)
-        minimized_states = mt.bind_minimized_states(list(filtered_data.keys()))
+        if retain_names:
+            names = {
+                index: frozenset(compiled.state_name(state) for state in blocks[index] if state != dead)
+                for index in block_order
+            }
+        else:
+            names = block_ids
 
-        new_transitions = dict()
         new_states = set()
-        new_initial_state = frozenset(self._search_in_list_of_sets(list(minimized_states), self.initial_state))
+        new_transitions = dict()
         new_final_states = set()
 
-        for state_set in minimized_states:
-            new_transitions.setdefault(frozenset(state_set), dict())
-            new_states.add(frozenset(state_set))
-            for symbol in self.inputs:
-                # we only need to check the transition of first element, other of the same set are the same
-                input_state = list(state_set)[0]
-                res_tr = self.transitions.get(input_state).get(symbol)
-                # the set that transition of 'input_state' with input symbol transit into
-                symbol_value = self._search_in_list_of_sets(list(minimized_states), res_tr)
+        for index in block_order:
+            # every state of a block has equivalent transitions, so the first one is enough
+            representative = next(iter(blocks[index]))
+            name = names[index]
+            new_states.add(name)
+            state_transitions = new_transitions.setdefault(name, dict())
 
-                # determine the final state(s)
-                for f_state in self.final_states:
-                    if f_state in symbol_value:
-                        new_final_states.add(frozenset(symbol_value))
+            if compiled.is_final(representative):
+                new_final_states.add(name)
 
-                new_transitions.get(frozenset(state_set)).setdefault(symbol, frozenset(symbol_value))
+            row = representative * stride
+            for symbol_id, symbol in enumerate(compiled.symbols):
+                next_block = block_of[table[row + symbol_id]]
+                if next_block != dead_block:
+                    state_transitions[symbol] = names[next_block]
 
-        if retain_names:
-            return self.__class__(
-                states=new_states,
-                inputs=self.inputs,
-                transitions=new_transitions,
-                final_states=new_final_states,
-                initial_state=new_initial_state
-            )
-        # retain_names == False should be implemented
-
-    @staticmethod
-    def _search_in_list_of_sets(list_obj: [set], data_to_check):
-        for i, set_obj in enumerate(list_obj):
-            if {data_to_check}.issubset(set_obj):
-                return set_obj
-        return False
+        return self.__class__(
+            states=new_states,
+            inputs=self.inputs,
+            transitions=new_transitions,
+            final_states=new_final_states,
+            initial_state=names[initial_block]
+        )
 
     @classmethod
-    def from_nfa(cls, nfa_instance, minify=True) -> Self:
-        # base on algo here: https://www.javatpoint.com/automata-conversion-from-nfa-to-dfa
-
-        new_transition, new_final_states = nfa_instance.eliminate_lambda_closures(update_origin=True)
-
-        q = set()  # set of states
-        checked_state = set()  # set of checked state
-
-        for state in nfa_instance.states:
-            q.add(frozenset({state}))
-        dfa_transitions = dict()
-
-        while not MinimizationTable.compare_list_of_sets(list(checked_state), list(q)):
-            for state in list(q):
-
-                dfa_transitions.setdefault(state, dict())
-                for input_symbol in nfa_instance.inputs:
-
-                    if state not in checked_state:
-                        next_state = nfa_instance.get_next_state(state, input_symbol)
-                        dfa_transitions.get(state).setdefault(input_symbol, frozenset(next_state))
-
-                        if next_state not in q:
-                            q.add(frozenset(next_state))
-
-                checked_state.add(frozenset(state))
-
-        # determine final states & initial state
-        dfa_final_states = set()
-        dfa_initial_state = None
-
-        for state in dfa_transitions:
-            if len(new_final_states.intersection(state)) > 0:
-                dfa_final_states.add(state)
-
-            if len(nfa_instance.initial_state.intersection(state)) > 0:
-                dfa_initial_state = state
-
-        if minify:
-            cls(
-                states=q,
-                final_states=dfa_final_states,
-                transitions=dfa_transitions,
-                initial_state=dfa_initial_state,
-                inputs=nfa_instance.inputs
-            ).minify()
-
-        return cls(
-            states=q,
-            final_states=dfa_final_states,
-            transitions=dfa_transitions,
-            initial_state=dfa_initial_state,
+    def from_nfa(cls, nfa_instance, minify=True) -> DFA:
+        # subset construction, states of the result are numbered from 0
+        import subset_construction
+
+        states, transitions, final_states = subset_construction.determinize(
+            nfa_instance.initial_states(),
+            nfa_instance.inputs,
+            nfa_instance.normalized_transitions(),
+            nfa_instance.final_states,
+            closures=nfa_instance.epsilon_closures()
+        )
+        dfa = cls(
+            states=states,
+            final_states=final_states,
+            transitions=transitions,
+            initial_state=0,
             inputs=nfa_instance.inputs
         )
 
+        if minify:
+            return dfa.minify(retain_names=False)
+        return dfa
+
     def add_transition(self, from_state, to_state, input_symbol, input_symbol_first=False):
         if input_symbol_first:
             if from_state in self.transitions:
@@ -547,12 +626,48 @@ class DFA:
                 self.transitions.setdefault(from_state, {to_state: input_symbol})
 
     @classmethod
-    def from_regex(cls, regex: str) -> Self:
-        compiled_nfa = Regex.Regex(regex)
-        return compiled_nfa.nfa.nfa_to_dfa()
+    def from_regex(cls, regex: str, method='thompson', cache=True) -> DFA:
+        """
+        method='thompson' builds a Thompson NFA and determinizes it,
+        method='glushkov' determinizes the Glushkov position automaton of the
+        regex tree directly and never builds epsilon states
+
+        with :cache the result is kept in the process-wide LRU cache of
+        regex_cache (see regex_cache.purge / set_maxsize / cache_info)
+        and every call gets its own copy of the cached DFA
+        """
+        if not cache:
+            return cls._compile_regex(regex, method)
+
+        import regex_cache
+
+        key = (regex, method, cls)
+        compiled = regex_cache.regex_cache.get(key)
+        if compiled is None:
+            compiled = cls._compile_regex(regex, method)
+            regex_cache.regex_cache.put(key, compiled)
+        return compiled.copy()
+
+    @classmethod
+    def _compile_regex(cls, regex: str, method: str) -> DFA:
+        if method == 'thompson':
+            import Regex
+
+            compiled_nfa = Regex.Regex(regex)
+            return compiled_nfa.nfa.nfa_to_dfa()
+
+        if method == 'glushkov':
+            import glushkov
+
+            states, transitions, final_states, inputs = glushkov.regex_to_dfa(regex)
+            return cls(states, inputs, transitions, final_states, 0)
+
+        raise ValueError(f'Unknown regex compilation method {method!r}')
 
     @staticmethod
     def to_regex(dfa):
+        import dfa_to_regex
+
         regex = dfa_to_regex.dfa_to_regex(dfa)
         return regex
 
@@ -0,0 +1,144 @@
+from collections import deque
+import exceptions
+
+
+def successors(dfa, state) -> list:
+    """ (symbol, next_state) pairs of :state, following the same rules as DFA.accept_input """
+    if state is None or state not in dfa.states:
+        return []
+    state_transitions = dfa.transitions.get(state)
+    if state_transitions is None:
+        return []
+    return [(symbol, next_state) for symbol, next_state in state_transitions.items() if next_state is not None]
+
+
+def reachable_states(dfa) -> list:
+    """ states reachable from the initial state in BFS order """
+    visited = {dfa.initial_state}
+    order = [dfa.initial_state]
+    queue = deque(order)
+    while queue:
+        state = queue.popleft()
+        for _, next_state in successors(dfa, state):
+            if next_state not in visited:
+                visited.add(next_state)
+                order.append(next_state)
+                queue.append(next_state)
+    return order
+
+
+def useful_states(dfa) -> set:
+    """ states that are reachable from the initial state and can reach a final state """
+    reachable = reachable_states(dfa)
+
+    # reverse-edge index over the reachable part only
+    predecessors = {state: [] for state in reachable}
+    for state in reachable:
+        for _, next_state in successors(dfa, state):
+            predecessors[next_state].append(state)
+
+    useful = {state for state in reachable if state in dfa.final_states}
+    queue = deque(useful)
+    while queue:
+        state = queue.popleft()
+        for previous_state in predecessors[state]:
+            if previous_state not in useful:
+                useful.add(previous_state)
+                queue.append(previous_state)
+    return useful
+
+
+def topological_order(dfa, states: set) -> list | None:
+    """ topological order of the subgraph induced by :states, None if it has a cycle (Kahn's algorithm) """
+    in_degree = dict.fromkeys(states, 0)
+    for state in states:
+        for _, next_state in successors(dfa, state):
+            if next_state in states:
+                in_degree[next_state] += 1
+
+    order = [state for state, degree in in_degree.items() if degree == 0]
+    for state in order:
+        for _, next_state in successors(dfa, state):
+            if next_state in states:
+                in_degree[next_state] -= 1
+                if in_degree[next_state] == 0:
+                    order.append(next_state)
+
+    return order if len(order) == len(states) else None
+
+
+def count_words_by_length(dfa) -> dict[int, int]:
+    """
+    number of accepted words of every length, DP in topological order over the
+    useful states where every symbol is a separate edge, counts are exact big ints
+    raises InfiniteLanguageException if the language is infinite
+    """
+    useful = useful_states(dfa)
+    if not useful:
+        return {}
+
+    order = topological_order(dfa, useful)
+    if order is None:
+        raise exceptions.InfiniteLanguageException('The Language accepted by DFA is infinite')
+
+    # paths[state][length] = number of words of that length leading from the initial state to state
+    paths = {state: dict() for state in useful}
+    paths[dfa.initial_state][0] = 1
+    for state in order:
+        state_paths = paths[state]
+        for _, next_state in successors(dfa, state):
+            if next_state not in useful:
+                continue
+            next_paths = paths[next_state]
+            for length, count in state_paths.items():
+                next_paths[length + 1] = next_paths.get(length + 1, 0) + count
+
+    counts = dict()
+    for state in useful:
+        if state in dfa.final_states:
+            for length, count in paths[state].items():
+                counts[length] = counts.get(length, 0) + count
+    return dict(sorted(counts.items()))
+
+
+def is_finite(dfa) -> bool:
+    """ the language is finite iff there is no cycle through useful states """
+    return topological_order(dfa, useful_states(dfa)) is not None
+
+
+def shortest_word_length(dfa) -> int:
+    """ BFS from the initial state that stops at the first final state reached """
+    if dfa.initial_state in dfa.final_states:
+        return 0
+
+    distance = {dfa.initial_state: 0}
+    queue = deque([dfa.initial_state])
+    while queue:
+        state = queue.popleft()
+        for _, next_state in successors(dfa, state):
+            if next_state not in distance:
+                distance[next_state] = distance[state] + 1
+                if next_state in dfa.final_states:
+                    return distance[next_state]
+                queue.append(next_state)
+
+    raise exceptions.EmptyLanguageException('The Language accepted by DFA is empty')
+
+
+def longest_word_length(dfa) -> int | None:
+    """ longest path over the useful states in topological order, None if the language is infinite """
+    useful = useful_states(dfa)
+    if not useful:
+        raise exceptions.EmptyLanguageException('The Language accepted by DFA is empty')
+
+    order = topological_order(dfa, useful)
+    if order is None:
+        return None
+
+    distance = dict.fromkeys(useful, 0)
+    for state in order:
+        for _, next_state in successors(dfa, state):
+            if next_state in useful and distance[state] + 1 > distance[next_state]:
+                distance[next_state] = distance[state] + 1
+
+    return max(distance[state] for state in useful if state in dfa.final_states)
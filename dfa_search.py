@@ -0,0 +1,144 @@
+from array import array
+
+LEFTMOST_LONGEST = 'leftmost-longest'
+ALL_ENDS = 'all-ends'
+
+
+class Searcher:
+    """
+    finds the substrings of a text that are in the language L of a DFA
+
+    the DFA is trimmed, minified and compiled once (`forward`, anchored L), both
+    modes cost O(len(text) * number of states) in the worst case, never a rescan per match:
+
+    leftmost-longest runs the reversed automaton (Σ*·L^R) backwards over the text, determinized
+    lazily so each of its states keeps its subset of `forward` states: live[p] is the set of
+    states from which some text[p:e] is accepted, a start is a position where the initial state
+    is live, and the anchored forward scan from a start stops as soon as its state is not live,
+    which is exactly at the end of the longest match
+
+    all-ends runs Σ*·L forwards as a set of `forward` states (at most one per state), each
+    tagged with the leftmost start that reaches it, so every end comes with its leftmost start
+
+    symbols outside the alphabet can not be part of a match, the scans restart there
+    """
+
+    def __init__(self, dfa):
+        self.forward = forward = dfa.trim().minify(retain_names=False).compile()
+        self.symbols = forward.symbols
+        self.empty = dfa.is_empty()
+
+        # predecessors[symbol_id][state] = states that go to state on that symbol
+        self.predecessors = [dict() for _ in forward.symbols]
+        for state in range(forward.num_states):
+            if state == forward.dead_state:
+                continue
+            for symbol_id in range(len(forward.symbols)):
+                next_state = forward.table[state * forward.stride + symbol_id]
+                if next_state != forward.dead_state:
+                    self.predecessors[symbol_id].setdefault(next_state, []).append(state)
+
+        final_states = frozenset(state for state in range(forward.num_states) if forward.is_final(state))
+        # lazily determinized Σ*·L^R, its states are subsets of forward states kept by id
+        self._subsets = [final_states]
+        self._subset_ids = {final_states: 0}
+        self._steps = dict()
+
+    def _step_back(self, subset_id: int, symbol_id: int) -> int:
+        # live set before reading symbol_id, given the live set after it
+        key = subset_id * self.forward.stride + symbol_id
+        next_id = self._steps.get(key)
+        if next_id is None:
+            predecessors = self.predecessors[symbol_id]
+            subset = set(self._subsets[0])
+            for state in self._subsets[subset_id]:
+                subset.update(predecessors.get(state, ()))
+            subset = frozenset(subset)
+            next_id = self._subset_ids.get(subset)
+            if next_id is None:
+                next_id = self._subset_ids[subset] = len(self._subsets)
+                self._subsets.append(subset)
+            self._steps[key] = next_id
+        return next_id
+
+    def _live(self, ids) -> array:
+        # live[p] = id of the subset of states from which some text[p:e] is accepted
+        unknown = self.forward.unknown_symbol
+        live = array('i', [0]) * (len(ids) + 1)
+        subset_id = 0
+        for p in range(len(ids) - 1, -1, -1):
+            symbol_id = ids[p]
+            subset_id = 0 if symbol_id == unknown else self._step_back(subset_id, symbol_id)
+            live[p] = subset_id
+        return live
+
+    def _leftmost_longest(self, ids):
+        forward, subsets = self.forward, self._subsets
+        table, stride, initial = forward.table, forward.stride, forward.initial_state
+        live = self._live(ids)
+        starts = bytearray(initial in subsets[subset_id] for subset_id in live)
+
+        position = 0
+        while position <= len(ids):
+            start = starts.find(1, position)
+            if start < 0:
+                return
+            # the state stays live until the end of the longest match, so the scan stops there
+            state, end = initial, start
+            while end < len(ids):
+                next_state = table[state * stride + ids[end]]
+                if next_state not in subsets[live[end + 1]]:
+                    break
+                state = next_state
+                end += 1
+            yield start, end
+            position = end if end > start else end + 1
+
+    def _all_ends(self, ids):
+        forward = self.forward
+        table, stride, dead, unknown = forward.table, forward.stride, forward.dead_state, forward.unknown_symbol
+        initial = forward.initial_state
+        # state -> leftmost start of a thread in that state
+        threads = dict()
+        for p in range(len(ids) + 1):
+            threads.setdefault(initial, p)
+            ends = [start for state, start in threads.items() if forward.is_final(state)]
+            if ends:
+                yield min(ends), p
+            if p == len(ids):
+                return
+
+            symbol_id = ids[p]
+            next_threads = dict()
+            if symbol_id != unknown:
+                for state, start in threads.items():
+                    next_state = table[state * stride + symbol_id]
+                    if next_state != dead and start < next_threads.get(next_state, p + 1):
+                        next_threads[next_state] = start
+            threads = next_threads
+
+    def finditer(self, text, mode=LEFTMOST_LONGEST):
+        """
+        yields (start, end) spans of the matches in :text
+
+        mode='leftmost-longest': non-overlapping matches, each one starts as far left
+        as possible and is as long as possible, like POSIX, after an empty match
+        the search goes on one position further
+
+        mode='all-ends': one span for every position where a match ends,
+        with the leftmost start of a match ending there, spans may overlap
+        """
+        if mode not in (LEFTMOST_LONGEST, ALL_ENDS):
+            raise ValueError(f'Unknown search mode {mode!r}')
+        if self.empty:
+            return
+        ids = self.forward.encode(text)
+
+        if mode == LEFTMOST_LONGEST:
+            yield from self._leftmost_longest(ids)
+        else:
+            yield from self._all_ends(ids)
+
+    def search(self, text, mode=LEFTMOST_LONGEST) -> tuple[int, int] | None:
+        """ the first span `finditer` would yield, None if there is no match """
+        return next(self.finditer(text, mode), None)
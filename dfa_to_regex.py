@@ -1,69 +1,10 @@
-import dfa as dfa_module
+import heapq
 
 
 class Consts:
     EPSILON = '$'
 
 
-def split_into_unique(string):
-    i, j, brac = 0, 0, 0
-    result = []
-
-    for c in string:
-        if c == "(":
-            brac += 1
-
-        elif c == ")":
-            brac -= 1
-
-        if brac == 0:
-            if c == "+":
-                result.append(string[i:j])
-                i = j + 1
-        j += 1
-
-    result.append(string[i:j])
-    result = list(set(result))
-
-    if "" in result:
-        result.remove("")
-
-    return result
-
-
-def union_regex(reg1, reg2):
-    split_reg_1 = split_into_unique(reg1)
-    split_reg_2 = split_into_unique(reg2)
-
-    merged_regex = list(set(split_reg_1) | set(split_reg_2))
-    return "+".join(merged_regex)
-
-
-def concat_regex(string_1, string_2):
-    if string_1 == "" or string_2 == "":
-        return ""
-
-    elif string_1[-1] == Consts.EPSILON:
-        return f"{string_1[:-1]}{string_2}"
-
-    elif string_2[0] == Consts.EPSILON:
-        return f"{string_1}{string_2[2:]}"
-
-    else:
-        return f"{string_1}{string_2}"
-
-
-def kleene_star_regex(string):
-    if string == Consts.EPSILON:
-        return Consts.EPSILON
-
-    elif string == "":
-        return Consts.EPSILON
-
-    else:
-        return f"{bracket(string)}*"
-
-
 # put a parenthesis around the string
 def bracket(string):
     if len(string) <= 1:
@@ -72,136 +13,221 @@ def bracket(string):
         return f"({string})"
 
 
-def is_final(state, visited: list, dfa):
-    if state in dfa.final_states:
-        return True
-    else:
-        visited.append(state)
-        for alphabet in dfa.inputs:
-            next_state = dfa.transitions.get(state).get(alphabet)
-            if next_state not in visited:
-                if is_final(next_state, visited, dfa):
-                    return True
-    return False
+class Term:
+    """
+    node of a regex built by a TermBuilder, terms are hash-consed: structurally
+    equal terms are the same object, so comparing or hashing one is O(1)
+    """
+    __slots__ = ('kind', 'args', 'nullable', 'size', '_text')
+
+    SYMBOL = 'symbol'
+    EPSILON = 'epsilon'
+    UNION = 'union'
+    CONCAT = 'concat'
+    STAR = 'star'
+
+    def __init__(self, kind, args, nullable):
+        self.kind = kind
+        # the symbol, a frozenset of alternatives, a tuple of factors or the starred term
+        self.args = args
+        self.nullable = nullable
+        # length of the text of the term, without building it
+        self.size = self._measure()
+        self._text = None
+
+    def _measure(self):
+        if self.kind == Term.SYMBOL:
+            return len(str(self.args))
+        if self.kind == Term.EPSILON:
+            return len(Consts.EPSILON)
+        if self.kind == Term.UNION:
+            return sum(alternative.size for alternative in self.args) + len(self.args) - 1
+        if self.kind == Term.CONCAT:
+            return sum(factor.size + 2 * (factor.kind == Term.UNION) for factor in self.args)
+        return self.args.size + 1 + 2 * (self.args.size > 1)
+
+    def __str__(self):
+        if self._text is None:
+            self._text = self._format()
+        return self._text
+
+    def _format(self):
+        if self.kind == Term.SYMBOL:
+            return str(self.args)
+        if self.kind == Term.EPSILON:
+            return Consts.EPSILON
+        if self.kind == Term.UNION:
+            return '+'.join(sorted(str(alternative) for alternative in self.args))
+        if self.kind == Term.CONCAT:
+            return ''.join(
+                f'({factor})' if factor.kind == Term.UNION else str(factor) for factor in self.args
+            )
+        return f'{bracket(str(self.args))}*'
+
+
+class TermBuilder:
+    """
+    makes hash-consed regex terms and simplifies them as they are built, the empty
+    language is None (no edge):
+
+    union: nested unions are flattened, duplicates dropped, ε is dropped next to a nullable
+    alternative and R next to R*
+    concat: ε and nested concats are flattened away, R*R* becomes R*
+    star: ∅* = ε* = ε, (R*)* = R*, ε and stars inside a starred union or a
+    starred concat of stars are dropped, (R* + S)* = (R + S)*, (R*S*)* = (R + S)*
+    """
+
+    def __init__(self):
+        self._terms = dict()
+        self.epsilon = self._make(Term.EPSILON, None, True)
+
+    def _make(self, kind, args, nullable) -> Term:
+        key = (kind, args)
+        term = self._terms.get(key)
+        if term is None:
+            term = self._terms[key] = Term(kind, args, nullable)
+        return term
+
+    def symbol(self, symbol) -> Term:
+        return self._make(Term.SYMBOL, symbol, False)
+
+    def union(self, *terms) -> Term | None:
+        alternatives = set()
+        for term in terms:
+            if term is None:
+                continue
+            if term.kind == Term.UNION:
+                alternatives.update(term.args)
+            else:
+                alternatives.add(term)
+
+        for alternative in list(alternatives):
+            if alternative.kind == Term.STAR:
+                alternatives.discard(alternative.args)
+        if len(alternatives) > 1 and self.epsilon in alternatives:
+            if any(alternative.nullable for alternative in alternatives if alternative is not self.epsilon):
+                alternatives.discard(self.epsilon)
+
+        if not alternatives:
+            return None
+        if len(alternatives) == 1:
+            return alternatives.pop()
+        alternatives = frozenset(alternatives)
+        return self._make(Term.UNION, alternatives, any(alternative.nullable for alternative in alternatives))
+
+    def concat(self, *terms) -> Term | None:
+        factors = []
+        for term in terms:
+            if term is None:
+                return None
+            for factor in (term.args if term.kind == Term.CONCAT else (term,)):
+                if factor is self.epsilon:
+                    continue
+                if factor.kind == Term.STAR and factors and factors[-1] is factor:
+                    continue
+                factors.append(factor)
+
+        if not factors:
+            return self.epsilon
+        if len(factors) == 1:
+            return factors[0]
+        return self._make(Term.CONCAT, tuple(factors), all(factor.nullable for factor in factors))
+
+    def star(self, term) -> Term:
+        if term is None or term is self.epsilon or term.kind == Term.STAR:
+            return self.epsilon if term is None else term
+
+        if term.kind == Term.UNION:
+            term = self.union(*(self._unstar(alternative) for alternative in term.args if alternative is not self.epsilon))
+        elif term.kind == Term.CONCAT and all(factor.kind == Term.STAR for factor in term.args):
+            term = self.union(*(factor.args for factor in term.args))
+
+        if term is None or term is self.epsilon or term.kind == Term.STAR:
+            return self.epsilon if term is None else term
+        return self._make(Term.STAR, term, True)
+
+    @staticmethod
+    def _unstar(term):
+        return term.args if term.kind == Term.STAR else term
 
 
 def dfa_to_regex(dfa):
-    L = {}  # converted state to regex
-
-    # find dead states
-    is_not_dead = {}
-
-    for state in dfa.compute_reachable_states():
-        is_not_dead[state] = is_final(state, [], dfa)
-
-    regex_dfa = dfa_module.DFA(set(), set(), dict(), set(), '')
-
-    # make new start state
-    regex_dfa.initial_state = 'P0'
-
-    # make new final states
-    regex_dfa.final_states.add('P1')
-    regex_dfa.states.add(regex_dfa.initial_state)
-
-    regex_dfa.states = regex_dfa.states.union(dfa.compute_reachable_states())
-    regex_dfa.states.add(list(regex_dfa.final_states)[0])
-    regex_dfa.inputs = dfa.inputs.union({Consts.EPSILON})
-
-    # attach initial state of regex_dfa to initial state of dfa with epsilon transition
-    regex_dfa.add_transition(regex_dfa.initial_state, dfa.initial_state, Consts.EPSILON, input_symbol_first=True)
-
-    # append rest of the transitions of dfa to regex_dfa
-    for state in dfa.compute_reachable_states():
-        regex_dfa.transitions.setdefault(state, dict())
-        for alphabet in dfa.inputs:
-            next_state = dfa.transitions.get(state).get(alphabet)
-            # appending only those which are not reachable from themselves from
-
-            if is_not_dead[next_state]:
-                regex_dfa.add_transition(state, next_state, alphabet, input_symbol_first=True)
-
-    # attach final states of dfs to final state of regex_dfa with epsilon transition
-    for state in dfa.final_states:
-        regex_dfa.add_transition(state, list(regex_dfa.final_states)[0], Consts.EPSILON, input_symbol_first=True)
-
-    regex_dfa.transitions.setdefault(list(regex_dfa.final_states)[0], dict())
-
-    for state_1 in regex_dfa.states:
-        L[state_1] = dict()
-
-        for state_2 in regex_dfa.states:
-            L[state_1][state_2] = []
-
-        for alphabet, next_state in regex_dfa.transitions[state_1].items():
-            L[state_1][next_state].append(alphabet)
-
-    reachable_non_dead_states = filter(lambda x: is_not_dead[x], dfa.compute_reachable_states())
-
-    # removing states one by one regex_dfa.states:
-    for chosen_state in reachable_non_dead_states:
-
-        # for Kleene star
-        string = ""
-        for transition_string in L[chosen_state][chosen_state]:
-            string = union_regex(string, transition_string)
-
-        if string != "":
-            string = kleene_star_regex(string)
-            L[chosen_state][chosen_state] = [string]
-
-            # for appending star with next values
-            next_states = list(regex_dfa.transitions.get(chosen_state).items())
-
-            for alphabet, next_state in next_states:
-                del regex_dfa.transitions[chosen_state][alphabet]
-
-                if chosen_state != next_state:
-                    for ind in range(len(L[chosen_state][next_state])):
-                        L[chosen_state][next_state][ind] = concat_regex(string, L[chosen_state][next_state][ind])
-                        regex_dfa.transitions \
-                            [chosen_state] \
-                            [L[chosen_state][next_state][ind]] = next_state
-
-        # concatenating prev state of chosen state to next states of chosen state
-        for prev_state in regex_dfa.states:
-
-            if prev_state != chosen_state:
-
-                prev_next_states = list(regex_dfa.transitions.get(prev_state).items())
-
-                for alphabet, next_state in prev_next_states:
-
-                    if next_state == chosen_state:
-
-                        # connecting prev_state to next of chosen
-                        all_new_strings = []
-
-                        for chosen_state_alphabet, chosen_next_state \
-                                in regex_dfa.transitions.get(chosen_state).items():
-
-                            new_strings = []
-
-                            for prev_to_chosen in L[prev_state][chosen_state]:
-                                chosen_to_next = chosen_state_alphabet
-
-                                # concatenate regex from previous state with curr state elimination
-                                string = concat_regex(prev_to_chosen, chosen_to_next)
-
-                                regex_dfa.transitions[prev_state][string] = chosen_next_state
-
-                                new_strings.append(string)
-                                all_new_strings.append(string)
-
-                            L[prev_state][chosen_next_state].extend(new_strings)
-
-                        if alphabet not in all_new_strings:
-                            del regex_dfa.transitions[prev_state][alphabet]
-
-    # at the end, only transition from initial -> final remains
-    # we must combine transition from start to end within the transition alphabet & prev regex
-
-    regex = ""
-    for transition_string in L[regex_dfa.initial_state][list(regex_dfa.final_states)[0]]:
-        regex = union_regex(regex, transition_string)
-
-    return regex
+    """
+    regex of the language of :dfa by state elimination, in the notation of Regex
+    ('+' union, juxtaposition for concatenation, '*') with Consts.EPSILON for ε,
+    "" if the language is empty
+
+    :dfa is trimmed first, so only useful states are eliminated, the next one is
+    always the state whose elimination adds the least text (the weight heuristic of
+    Delgado and Morais, which favours states of low in-degree × out-degree), so
+    intermediate expressions stay small, edge labels are hash-consed terms of a TermBuilder
+    """
+    import dfa_analysis
+
+    dfa = dfa.trim()
+    if not dfa.final_states:
+        return ""
+    # BFS order, so ties in the elimination order (and the output) do not depend on set order
+    states = dfa_analysis.reachable_states(dfa)
+
+    builder = TermBuilder()
+    start, end = object(), object()
+
+    # out_edges[p][q] / in_edges[q][p] = label of the edge p -> q
+    out_edges = {state: dict() for state in states}
+    in_edges = {state: dict() for state in states}
+    out_edges[start], in_edges[end] = dict(), dict()
+
+    def add_edge(p, q, term):
+        label = builder.union(out_edges[p].get(q), term)
+        out_edges[p][q] = label
+        in_edges[q][p] = label
+
+    add_edge(start, dfa.initial_state, builder.epsilon)
+    for state in states:
+        for symbol, next_state in dfa_analysis.successors(dfa, state):
+            add_edge(state, next_state, builder.symbol(symbol))
+        if state in dfa.final_states:
+            add_edge(state, end, builder.epsilon)
+
+    def cost(state):
+        # growth of the total label size when :state is eliminated, every label into it is
+        # copied once per successor, every label out of it (and its loop) once per predecessor
+        loop = out_edges[state].get(state)
+        into = [label for p, label in in_edges[state].items() if p != state]
+        out_of = [label for q, label in out_edges[state].items() if q != state]
+        weight = sum(label.size for label in into) * (len(out_of) - 1)
+        weight += sum(label.size for label in out_of) * (len(into) - 1)
+        if loop is not None:
+            weight += loop.size * (len(into) * len(out_of) - 1)
+        return weight
+
+    heap = [(cost(state), i, state) for i, state in enumerate(states)]
+    heapq.heapify(heap)
+    order = {state: i for _, i, state in heap}
+    eliminated = set()
+
+    while heap:
+        priority, _, state = heapq.heappop(heap)
+        if state in eliminated or priority != cost(state):
+            continue
+        eliminated.add(state)
+
+        loop = builder.star(out_edges[state].pop(state, None))
+        in_edges[state].pop(state, None)
+        predecessors = in_edges.pop(state)
+        successors = out_edges.pop(state)
+
+        for p, into in predecessors.items():
+            del out_edges[p][state]
+            for q, out_of in successors.items():
+                add_edge(p, q, builder.concat(into, loop, out_of))
+        for q in successors:
+            del in_edges[q][state]
+
+        for neighbour in set(predecessors) | set(successors):
+            if neighbour in order:
+                heapq.heappush(heap, (cost(neighbour), order[neighbour], neighbour))
+
+    regex = out_edges[start].get(end)
+    return "" if regex is None else str(regex)
@@ -23,6 +23,12 @@ class SymbolMisMatchException(AutomatonException):
     """In Product of 2 DFAs if input symbols are not equal"""
     pass
 
+
+class LexerException(AutomatonException):
+    """No token rule matches the input at some position"""
+    pass
+
+
 class ElementNotInTable(Exception):
     """if an element is not in table"""
     pass
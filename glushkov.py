@@ -0,0 +1,80 @@
+import regex_ast
+import subset_construction
+
+
+def position_automaton(node: regex_ast.RegexNode) -> tuple[dict, set]:
+    """
+    Glushkov position automaton of a regex tree, an NFA without epsilon transitions
+    state 0 is the initial state and state i is the i-th symbol occurrence of the regex,
+    it goes to i on that symbol from 0 (if i is in first) or from p (if i is in followpos(p))
+
+    returns ({state: {symbol: set of states}}, final states)
+    """
+    symbols = [None]
+    follow = [set()]
+    # (nullable, first, last) of every finished subtree
+    values = []
+    stack = [(node, False)]
+
+    while stack:
+        current, expanded = stack.pop()
+
+        if isinstance(current, regex_ast.Symbol):
+            position = len(symbols)
+            symbols.append(current.symbol)
+            follow.append(set())
+            values.append((False, {position}, {position}))
+
+        elif not expanded:
+            # children are pushed right to left so the left one is finished first
+            stack.append((current, True))
+            stack.extend((child, False) for child in reversed(regex_ast.children(current)))
+
+        elif isinstance(current, regex_ast.Star):
+            _, first, last = values.pop()
+            for position in last:
+                follow[position] |= first
+            values.append((True, first, last))
+
+        else:
+            right_nullable, right_first, right_last = values.pop()
+            left_nullable, left_first, left_last = values.pop()
+
+            if isinstance(current, regex_ast.Union):
+                values.append((left_nullable or right_nullable, left_first | right_first, left_last | right_last))
+            else:
+                for position in left_last:
+                    follow[position] |= right_first
+                values.append((
+                    left_nullable and right_nullable,
+                    left_first | right_first if left_nullable else left_first,
+                    left_last | right_last if right_nullable else right_last
+                ))
+
+    nullable, first, last = values.pop()
+    follow[0] = first
+
+    transitions = dict()
+    for state, next_positions in enumerate(follow):
+        row = transitions.setdefault(state, dict())
+        for position in next_positions:
+            row.setdefault(symbols[position], set()).add(position)
+
+    final_states = set(last)
+    if nullable:
+        final_states.add(0)
+    return transitions, final_states
+
+
+def regex_to_dfa(regex: str) -> tuple[set, dict, set, set]:
+    """
+    determinizes the position automaton of :regex directly, no epsilon states are built
+
+    returns (states, transitions, final_states, inputs) of a DFA whose initial state is 0
+    """
+    node, language = regex_ast.parse(regex)
+    transitions, final_states = position_automaton(node)
+    states, dfa_transitions, dfa_final_states = subset_construction.determinize(
+        {0}, language, transitions, final_states, complete=False
+    )
+    return states, dfa_transitions, dfa_final_states, language
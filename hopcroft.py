@@ -0,0 +1,62 @@
+from compiled_dfa import CompiledDFA
+
+
+def _inverse_transitions(compiled: CompiledDFA, states) -> list[dict]:
+    """ inverse[symbol_id][target] -> list of states in :states that go to target on symbol_id """
+    table, stride = compiled.table, compiled.stride
+    inverse = [dict() for _ in range(len(compiled.symbols))]
+    for state in states:
+        row = state * stride
+        for symbol_id, inverse_symbol in enumerate(inverse):
+            inverse_symbol.setdefault(table[row + symbol_id], []).append(state)
+    return inverse
+
+
+def refine_partition(compiled: CompiledDFA, states) -> list[set[int]]:
+    """
+    Hopcroft's partition refinement over :states (which must be closed under the transitions),
+    returns the blocks of equivalent states, runs in O(n * k * log n)
+    """
+    states = list(states)
+    inverse = _inverse_transitions(compiled, states)
+
+    finals = {state for state in states if compiled.is_final(state)}
+    others = set(states) - finals
+    blocks = [block for block in (finals, others) if block]
+    if len(blocks) < 2:
+        return blocks
+
+    block_of = {}
+    for index, block in enumerate(blocks):
+        for state in block:
+            block_of[state] = index
+
+    waiting = {0 if len(blocks[0]) <= len(blocks[1]) else 1}
+    while waiting:
+        # the splitter is copied since its block may itself be split below
+        splitter = list(blocks[waiting.pop()])
+
+        for inverse_symbol in inverse:
+            touched = dict()
+            for target in splitter:
+                for state in inverse_symbol.get(target, ()):
+                    touched.setdefault(block_of[state], []).append(state)
+
+            for index, members in touched.items():
+                block = blocks[index]
+                if len(members) == len(block):
+                    continue
+
+                new_block = set(members)
+                block.difference_update(new_block)
+                new_index = len(blocks)
+                blocks.append(new_block)
+                for state in new_block:
+                    block_of[state] = new_index
+
+                if index in waiting or len(new_block) <= len(block):
+                    waiting.add(new_index)
+                else:
+                    waiting.add(index)
+
+    return blocks
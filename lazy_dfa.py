@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from nfa_simulation import BitsetNFA
+
+
+class LazyDFA:
+    """
+    hybrid matcher in the style of RE2, DFA states (bit vectors of active NFA states)
+    are only created when the input needs them and kept in a cache of :max_states states,
+    least recently used states are evicted when it is full
+
+    if a single input evicts more than :fallback_evictions states the cache is thrashing,
+    the rest of that input is matched with plain NFA simulation instead
+    """
+
+    def __init__(self, nfa, max_states: int = 1024, fallback_evictions: int | None = None):
+        if max_states < 1:
+            raise ValueError('max_states must be at least 1')
+
+        self.simulator = BitsetNFA(nfa)
+        self.max_states = max_states
+        self.fallback_evictions = max_states if fallback_evictions is None else fallback_evictions
+        # active mask -> {symbol: next active mask}
+        self._cache = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def from_regex(cls, regex: str, **kwargs) -> 'LazyDFA':
+        import Regex
+
+        return cls(Regex.Regex(regex).nfa, **kwargs)
+
+    def _next(self, active: int, symbol) -> int:
+        row = self._cache.get(active)
+        if row is None:
+            row = self._cache[active] = dict()
+            if len(self._cache) > self.max_states:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._cache.move_to_end(active)
+
+        next_active = row.get(symbol)
+        if next_active is None:
+            self.misses += 1
+            next_active = row[symbol] = self.simulator.step(active, symbol)
+        else:
+            self.hits += 1
+        return next_active
+
+    def run(self, input_str) -> int:
+        active = self.simulator.initial_mask
+        evictions = self.evictions
+        symbols = iter(input_str)
+        for c in symbols:
+            if not active:
+                break
+            if self.evictions - evictions > self.fallback_evictions:
+                self.fallbacks += 1
+                return self.simulator.run(symbols, self.simulator.step(active, c))
+            active = self._next(active, c)
+        return active
+
+    def accepts(self, input_str) -> bool:
+        return self.run(input_str) & self.simulator.final_mask != 0
+
+    def stats(self) -> dict:
+        return {
+            'states': len(self._cache),
+            'max_states': self.max_states,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'fallbacks': self.fallbacks,
+        }
+
+    def clear(self):
+        """ drops every cached state, the counters are kept """
+        self._cache.clear()
@@ -0,0 +1,171 @@
+from collections import OrderedDict, deque
+import exceptions
+
+
+class ProductFinalStates:
+    """ container view over the final states of a LazyProductDFA, only supports `in` """
+
+    def __init__(self, product):
+        self.product = product
+
+    def __contains__(self, state):
+        return self.product.is_final(state)
+
+
+class LazyProductDFA:
+    """
+    product of two DFAs (or lazy products) whose states and transitions are
+    only computed when a matcher or a search visits them
+
+    product states are pairs (state_1, state_2), a pair that can never
+    be accepted is replaced by `None` like a missing transition of a DFA,
+    :cache_size bounds the number of product states whose transitions are kept
+    (least recently used ones are dropped first), None means no bound
+    """
+
+    UNION = 'union'
+    INTERSECTION = 'intersection'
+    DIFFERENCE = 'difference'
+
+    _final_rules = {
+        UNION: lambda final_1, final_2: final_1 or final_2,
+        INTERSECTION: lambda final_1, final_2: final_1 and final_2,
+        DIFFERENCE: lambda final_1, final_2: final_1 and not final_2,
+    }
+
+    def __init__(self, dfa1, dfa2, operation: str, cache_size: int | None = None):
+        if dfa1.inputs != dfa2.inputs:
+            raise exceptions.SymbolMisMatchException('The Input Symbols are not Equal!')
+        if operation not in self._final_rules:
+            raise ValueError(f'Unknown product operation {operation!r}')
+
+        self.dfa1 = dfa1
+        self.dfa2 = dfa2
+        self.operation = operation
+        self.inputs = dfa1.inputs
+        self.cache_size = cache_size
+        self.initial_state = self._make_state(dfa1.initial_state, dfa2.initial_state)
+        self.final_states = ProductFinalStates(self)
+        self._final_rule = self._final_rules[operation]
+        self._cache = OrderedDict()
+
+    def _make_state(self, state_1, state_2):
+        if self.operation == self.UNION:
+            dead = state_1 is None and state_2 is None
+        else:
+            # intersection and difference both need state_1 to be alive
+            dead = state_1 is None or (self.operation == self.INTERSECTION and state_2 is None)
+        return None if dead else (state_1, state_2)
+
+    def is_final(self, state) -> bool:
+        if state is None:
+            return False
+        state_1, state_2 = state
+        return self._final_rule(state_1 in self.dfa1.final_states, state_2 in self.dfa2.final_states)
+
+    def _get_next_state(self, current_state, m_input):
+        if current_state is None:
+            return None
+
+        row = self._cache.get(current_state)
+        if row is None:
+            row = dict()
+            if self.cache_size != 0:
+                self._cache[current_state] = row
+                if self.cache_size is not None and len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        elif self.cache_size is not None:
+            self._cache.move_to_end(current_state)
+
+        if m_input in row:
+            return row[m_input]
+
+        state_1, state_2 = current_state
+        next_state = self._make_state(
+            self.dfa1._get_next_state(state_1, m_input),
+            self.dfa2._get_next_state(state_2, m_input)
+        )
+        row[m_input] = next_state
+        return next_state
+
+    def accept_input(self, input_str) -> bool:
+        current_state = self.initial_state
+        for c in input_str:
+            current_state = self._get_next_state(current_state, c)
+            if current_state is None:
+                return False
+
+        return self.is_final(current_state)
+
+    def shortest_accepted_word(self) -> str | None:
+        """
+        breadth-first search of the product that stops at the first final state found,
+        returns the shortest accepted word or None if the product language is empty
+        """
+        if self.initial_state is None:
+            return None
+        if self.is_final(self.initial_state):
+            return ''
+
+        symbols = sorted(self.inputs, key=str)
+        # parent[state] = (previous state, symbol), used to spell the word back
+        parent = {self.initial_state: None}
+        queue = deque([self.initial_state])
+        while queue:
+            state = queue.popleft()
+            for symbol in symbols:
+                next_state = self._get_next_state(state, symbol)
+                if next_state is None or next_state in parent:
+                    continue
+
+                parent[next_state] = (state, symbol)
+                if self.is_final(next_state):
+                    word = []
+                    while parent[next_state] is not None:
+                        next_state, symbol = parent[next_state]
+                        word.append(symbol)
+                    return ''.join(reversed(word))
+                queue.append(next_state)
+
+        return None
+
+    def is_empty(self) -> bool:
+        """ searches the product only until the first final state is found """
+        return self.shortest_accepted_word() is None
+
+    def materialize(self):
+        """ builds the reachable part of the product as a plain DFA """
+        from dfa import DFA
+
+        new_states = set()
+        new_transitions = dict()
+        new_final_states = set()
+
+        if self.initial_state is not None:
+            new_states.add(self.initial_state)
+            queue = deque([self.initial_state])
+            while queue:
+                state = queue.popleft()
+                state_transitions = new_transitions.setdefault(state, dict())
+                if self.is_final(state):
+                    new_final_states.add(state)
+
+                for symbol in self.inputs:
+                    next_state = self._get_next_state(state, symbol)
+                    if next_state is None:
+                        continue
+                    state_transitions[symbol] = next_state
+                    if next_state not in new_states:
+                        new_states.add(next_state)
+                        queue.append(next_state)
+
+        return DFA(
+            states=new_states,
+            inputs=self.inputs,
+            transitions=new_transitions,
+            final_states=new_final_states,
+            initial_state=self.initial_state
+        )
+
+    def cache_info(self) -> dict:
+        return {'states': len(self._cache), 'max_states': self.cache_size}
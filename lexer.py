@@ -0,0 +1,102 @@
+import codecs
+from array import array
+from collections import namedtuple
+import exceptions
+from pattern_set import PatternSet
+
+Token = namedtuple('Token', ['name', 'value', 'start'])
+
+# consumed input is dropped from the buffer once it is at least this long
+_COMPACT_SIZE = 1 << 16
+
+
+class Lexer:
+    """
+    tokenizer over an ordered list of (token name, regex or DFA) rules
+
+    all rules are compiled into one PatternSet product, every product state knows
+    the lowest rule id it accepts, so a token is found with one scan whatever the
+    number of rules: the longest match wins (maximal munch) and on equal length
+    the rule listed first, tokens whose name is in :skip are matched but not yielded
+    """
+
+    def __init__(self, rules, skip=()):
+        rules = list(rules)
+        self.names = [name for name, _ in rules]
+        self.skip = set(skip)
+        self.patterns = PatternSet([pattern for _, pattern in rules])
+        self.compiled = self.patterns.compiled
+
+        # rule_ids[state] = lowest id of the rules accepted in that state, -1 if none
+        self.rule_ids = array('i', [(mask & -mask).bit_length() - 1 for mask in self.patterns.accept_masks])
+
+        initial_rule = self.rule_ids[self.compiled.initial_state]
+        if initial_rule >= 0:
+            raise exceptions.LexerException(f'Rule {self.names[initial_rule]!r} matches the empty string')
+
+    def tokenize(self, text):
+        """ yields the Tokens of :text """
+        return self.tokenize_stream((text,))
+
+    def tokenize_stream(self, chunks, encoding='utf-8'):
+        """
+        yields the Tokens of the text given as an iterable of chunks (str, or bytes decoded
+        with :encoding), e.g. iter(partial(f.read, 65536), '') for a file,
+        a token may span chunks, the buffer keeps the current token plus the consumed
+        text before it, which is dropped once it reaches _COMPACT_SIZE (64K)
+        """
+        compiled, rule_ids = self.compiled, self.rule_ids
+        table, stride, symbol_ids, dead = compiled.table, compiled.stride, compiled.symbol_ids, compiled.dead_state
+
+        chunks = iter(chunks)
+        decoder = None
+        exhausted = False
+        buffer = ''
+        # buffer[0] is at offset `base` of the whole input, the next token starts at buffer[position]
+        base = position = 0
+
+        while True:
+            if position >= _COMPACT_SIZE:
+                buffer = buffer[position:]
+                base += position
+                position = 0
+
+            state = compiled.initial_state
+            i = position
+            end = rule = -1
+            while True:
+                if i == len(buffer):
+                    if exhausted:
+                        break
+                    chunk = next(chunks, None)
+                    if isinstance(chunk, (bytes, bytearray, memoryview)):
+                        if decoder is None:
+                            decoder = codecs.getincrementaldecoder(encoding)()
+                        chunk = decoder.decode(chunk)
+                    elif chunk is None:
+                        exhausted = True
+                        chunk = decoder.decode(b'', final=True) if decoder is not None else ''
+                    buffer += chunk
+                    continue
+
+                symbol_id = symbol_ids.get(buffer[i])
+                if symbol_id is None:
+                    break
+                state = table[state * stride + symbol_id]
+                if state == dead:
+                    break
+                i += 1
+                if rule_ids[state] >= 0:
+                    end, rule = i, rule_ids[state]
+
+            if position == len(buffer):
+                return
+            if rule < 0:
+                raise exceptions.LexerException(
+                    f'No token matches at position {base + position}: {buffer[position:position + 16]!r}'
+                )
+
+            name = self.names[rule]
+            if name not in self.skip:
+                yield Token(name, buffer[position:end], base + position)
+            position = end
@@ -1,7 +1,3 @@
-import dfa as dfa_module
-import Regex
-
-
 class NFA:
     def __init__(self, states, transitions: dict, inputs: set, initial_state, final_states):
         self.states = states
@@ -9,6 +5,10 @@ class NFA:
         self.inputs = inputs
         self.initial_state = initial_state
         self.final_states = final_states
+        # built from the transitions on first use, dropped when they change
+        self._normalized = None
+        self._closures = None
+        self._simulator = None
 
     def get_next_state(self, states, input_symbol):
         transition_set = set()
@@ -37,61 +37,47 @@ class NFA:
                         tr_states.add(tns)
         return tr_states
 
-    def _compute_lambda_closure(self, states: set, lambda_frozen=False):
-        # base on algorithm in chapter 3 of Introduction to computation theory page 102
+    def epsilon_closures(self) -> dict:
         """
-
-        t = {1, 2, 3}
+        {state: frozenset of its epsilon closure} for every state, computed once
+        (SCC condensation + one pass in topological order) and kept until the transitions change
         """
-        t = states
-
-        if not isinstance(states, set):
-            t = {states}
+        if self._closures is None:
+            import subset_construction
 
-        found_closure = False
-        v = 0
+            self._closures = subset_construction.epsilon_closure_table(
+                self.normalized_transitions(), set(self.states) | self.initial_states()
+            )
+        return self._closures
 
-        while not found_closure:
-            v = len(t)
-            for state in list(t):
-                if self.transitions.get(state) is not None:
-                    if lambda_frozen:
-                        l_tr_state = self.transitions.get(state).get(frozenset({''}))
-                    else:
-                        l_tr_state = self.transitions.get(state).get('')
-
-                    if l_tr_state is not None and l_tr_state not in t:
-                        if type(l_tr_state) == frozenset or type(l_tr_state) == set:
-                            for _state in l_tr_state:
-                                t.add(_state)
-                        else:
-                            t.add(l_tr_state)
-                    else:
-                        t.add(state)
+    def _invalidate_caches(self):
+        self._normalized = None
+        self._closures = None
+        self._simulator = None
 
-            if v == len(t):
-                found_closure = True
+    def _compute_lambda_closure(self, states: set, lambda_frozen=False):
+        # base on algorithm in chapter 3 of Introduction to computation theory page 102
+        # closures are read from the precomputed table, lambda_frozen is kept for compatibility
+        if not isinstance(states, (set, frozenset)):
+            states = {states}
 
+        closures = self.epsilon_closures()
+        t = set()
+        for state in states:
+            t |= closures.get(state, {state})
         return t
 
-    def _compute_sigma_star(self, states, input_symbol):
-        # initial_set = self._compute_lambda_closure(state)
-
-        if type(states) != set and type(states) != frozenset:
+    def _compute_sigma_star(self, states, input_symbol) -> frozenset:
+        # lambda closure of the states reached from :states on :input_symbol
+        if not isinstance(states, (set, frozenset)):
             states = {states}
-        next_lambda_closure = set()
-
-        for _state in list(states):
-            if self.transitions.get(_state) is not None:
-                l_tr_state = self.transitions.get(_state).get(input_symbol)
 
-                if l_tr_state is not None:
-                    next_lambda_closure.add(frozenset(l_tr_state))
+        transitions = self.normalized_transitions()
+        next_states = set()
+        for state in states:
+            next_states.update(transitions.get(state, {}).get(input_symbol, ()))
 
-        result = self._compute_lambda_closure(next_lambda_closure)
-        if len(result) > 0:
-            return list(result)[0]
-        return frozenset(result)
+        return frozenset(self._compute_lambda_closure(next_states))
 
     def eliminate_lambda_closures(self, update_origin=False):
         new_transition = dict()
@@ -99,95 +85,86 @@ class NFA:
 
         for state in self.states:
             new_transition.setdefault(state, dict())
+            closure = self._compute_lambda_closure(state)
 
-            for f_state in self.final_states:
-                if f_state in self._compute_lambda_closure({state}):
-                    new_final_states.add(state)
+            if not closure.isdisjoint(self.final_states):
+                new_final_states.add(state)
 
             for char in self.inputs:
-                l_tr_state = self._compute_sigma_star(state, char)
-
-                if type(l_tr_state) == set or type(l_tr_state) == frozenset:
-                    if len(l_tr_state) > 0:
-                        new_transition.get(state).setdefault(char, l_tr_state)
-
-                elif l_tr_state is not None:
+                l_tr_state = self._compute_sigma_star(closure, char)
+                if len(l_tr_state) > 0:
                     new_transition.get(state).setdefault(char, l_tr_state)
 
         if update_origin:
             self.transitions = new_transition
             self.final_states = new_final_states
+            self._invalidate_caches()
 
         return new_transition, new_final_states
 
     # for regex
     def getEClose(self, _state):
-        all_states = set()
-        states = set([_state])
-        while len(states) != 0:
-            state = states.pop()
-            all_states.add(state)
-            if state in self.transitions:
-                for tns in self.transitions[state]:
-                    if '' in self.transitions[state][tns] and tns not in all_states:
-                        states.add(tns)
-        return all_states
+        return set(self.epsilon_closures().get(_state, {_state}))
 
     # for regex
     def nfa_to_dfa(self):
-        # https://www.javatpoint.com/automata-conversion-from-nfa-with-null-to-dfa
-
-        all_states = dict()
-        eclose = dict()
-        count = 1
-        state1 = self._compute_lambda_closure(self.initial_state)
-        eclose[self.initial_state] = state1
-        dfa = dfa_module.DFA(set(), self.inputs, dict(), set(), set())
-        dfa.initial_state = count
-        states = [[state1, count]]
-        all_states[count] = state1
-        count += 1
-
-        while len(states) != 0:
-            [state, from_index] = states.pop()
-
-            for char in dfa.inputs:
-
-                # sigma prime value = tr_state
-                tr_state: set = self.get_transitions(state, char)
-
-                # get lambda closure of every state in tr_state
-                for s in list(tr_state)[:]:
-                    if s not in eclose:
-                        eclose[s] = self.getEClose(s)
-                    tr_state = tr_state.union(eclose[s])
-
-                if len(tr_state) != 0:
-                    if tr_state not in all_states.values():
-                        states.append([tr_state, count])
-                        all_states[count] = tr_state
-                        to_index = count
-                        count += 1
+        # imported here, dfa -> Regex -> nfa would be a circular import otherwise
+        import dfa as dfa_module
+        import subset_construction
 
-                    else:
-                        for key, val in all_states.items():
-                            if val == tr_state:
-                                to_index = key
+        states, transitions, final_states = subset_construction.determinize(
+            self.initial_states(), self.inputs, self.normalized_transitions(), self.final_states,
+            complete=False, closures=self.epsilon_closures()
+        )
+        return dfa_module.DFA(states, self.inputs, transitions, final_states, 0)
+
+    def accepts(self, input_str) -> bool:
+        """
+        matches directly on the NFA, the active states are kept as one bit vector
+        so there is no determinization and no exponential blowup
+        """
+        if self._simulator is None:
+            from nfa_simulation import BitsetNFA
 
-                    dfa.add_transition(from_index, to_index, char)
+            self._simulator = BitsetNFA(self)
+        return self._simulator.accepts(input_str)
 
-        # set final states
-        for value, state in all_states.items():
-            if list(self.final_states)[0] in state:
-                dfa.final_states.add(value)
+    def initial_states(self) -> set:
+        # Regex keeps a single initial state, other NFAs a set of them
+        if isinstance(self.initial_state, (set, frozenset, list, tuple)):
+            return set(self.initial_state)
+        return {self.initial_state}
 
-        dfa.transitions = Regex.convert_transitions_normal_form(dfa.transitions)
-        return dfa
+    def normalized_transitions(self) -> dict:
+        """
+        {state: {symbol: set of next states}} with '' for epsilon, for both layouts of
+        `transitions`: {state: {symbol: next states}} and {state: {next state: symbols}} built by Regex,
+        cached until the transitions change
+        """
+        if self._normalized is not None:
+            return self._normalized
+
+        normalized = dict()
+        for state, state_transitions in self.transitions.items():
+            row = normalized.setdefault(state, dict())
+            for key, value in state_transitions.items():
+                if key == '' or key in self.inputs:
+                    if isinstance(value, (set, frozenset, list, tuple)):
+                        row.setdefault(key, set()).update(value)
+                    else:
+                        row.setdefault(key, set()).add(value)
+                else:
+                    for symbol in value:
+                        row.setdefault(symbol, set()).add(key)
+
+        self._normalized = normalized
+        return normalized
 
     def add_transition(self, state_1: set | frozenset | int, state_2: set | frozenset | int, input_symbol: str):
         if isinstance(input_symbol, str):
             input_symbol = set([input_symbol])
 
+        self._invalidate_caches()
         self.states.add(state_1)
         self.states.add(state_2)
         if state_1 in self.transitions:
@@ -202,21 +179,3 @@ class NFA:
         for from_state, to_states in transitions.items():
             for state in to_states:
                 self.add_transition(from_state, state, to_states[state])
-
-    # for regex transition
-    def build_from_number(self, start_num):
-        translations = dict()
-        for i in list(self.states):
-            translations[i] = start_num
-            start_num += 1
-
-        rebuild = NFA(set(), dict(), self.inputs, set(), set())
-        rebuild.initial_state = translations.get(self.initial_state)
-        rebuild.final_states.add(translations[list(self.final_states)[0]])
-        for from_state, to_states in self.transitions.items():
-            for state in to_states:
-                if isinstance(state, set) and len(state) > 0:
-                    state = list(state)[0]
-
-                rebuild.add_transition(translations[from_state], translations[state], to_states[state])
-        return [rebuild, start_num]
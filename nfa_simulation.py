@@ -0,0 +1,98 @@
+import subset_construction
+
+
+class BitsetNFA:
+    """
+    Thompson simulation of an NFA where the set of active states is one int bit vector
+
+    successor masks already include epsilon closures, a step ORs together
+    per-byte tables of the active vector (filled on first use), so it costs
+    O(m / 8) int operations and no Python sets are built while matching
+    """
+
+    def __init__(self, nfa):
+        transitions = nfa.normalized_transitions()
+
+        states = list(nfa.states)
+        index = {state: i for i, state in enumerate(states)}
+        for state, row in transitions.items():
+            for next_states in [[state]] + list(row.values()):
+                for next_state in next_states:
+                    if next_state not in index:
+                        index[next_state] = len(states)
+                        states.append(next_state)
+        for state in nfa.initial_states() | set(nfa.final_states):
+            if state not in index:
+                index[state] = len(states)
+                states.append(state)
+
+        self.states = states
+        self.index = index
+        self.num_bytes = (len(states) + 7) // 8
+
+        closures = nfa.epsilon_closures()
+        closure_masks = [self._mask(closures.get(state, (state,))) for state in states]
+
+        self.initial_mask = 0
+        for state in nfa.initial_states():
+            self.initial_mask |= closure_masks[index[state]]
+        self.final_mask = self._mask(nfa.final_states)
+
+        # successor_masks[symbol][i] = closure of the states reached from states[i] on symbol
+        self.successor_masks = dict()
+        for state, row in transitions.items():
+            for symbol, next_states in row.items():
+                if symbol == subset_construction.EPSILON:
+                    continue
+                masks = self.successor_masks.setdefault(symbol, [0] * len(states))
+                for next_state in next_states:
+                    masks[index[state]] |= closure_masks[index[next_state]]
+
+        # byte_tables[symbol][byte_index][byte] = OR of the successor masks of the bits set in byte
+        self.byte_tables = {symbol: [dict() for _ in range(self.num_bytes)] for symbol in self.successor_masks}
+
+    def _mask(self, states) -> int:
+        mask = 0
+        for state in states:
+            mask |= 1 << self.index[state]
+        return mask
+
+    def step(self, active: int, symbol) -> int:
+        tables = self.byte_tables.get(symbol)
+        if tables is None:
+            return 0
+
+        successors = None
+        result = 0
+        for byte_index, byte in enumerate(active.to_bytes(self.num_bytes, 'little')):
+            if not byte:
+                continue
+            table = tables[byte_index]
+            mask = table.get(byte)
+            if mask is None:
+                if successors is None:
+                    successors = self.successor_masks[symbol]
+                mask = 0
+                base = byte_index * 8
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        mask |= successors[base + bit]
+                table[byte] = mask
+            result |= mask
+        return result
+
+    def run(self, input_str, active: int = None) -> int:
+        """ returns the active states (as a bit vector) after reading :input_str """
+        if active is None:
+            active = self.initial_mask
+        for c in input_str:
+            if not active:
+                break
+            active = self.step(active, c)
+        return active
+
+    def accepts(self, input_str) -> bool:
+        return self.run(input_str) & self.final_mask != 0
+
+    def active_states(self, active: int) -> set:
+        return {state for i, state in enumerate(self.states) if active >> i & 1}
@@ -0,0 +1,133 @@
+import math
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from compiled_dfa import CompiledDFA, StreamMatcher
+
+# chunks smaller than this are not worth a task
+MIN_CHUNK_SIZE = 1 << 20
+# chunks per worker, a few more than one so slow chunks do not leave cores idle
+CHUNKS_PER_WORKER = 4
+# chunk_map looks for start states that have merged after blocks of these sizes (doubling)
+MIN_MERGE_BLOCK = 64
+MAX_MERGE_BLOCK = 1 << 16
+
+# set in every worker process by _attach, the table is read from shared memory, never pickled
+_shared = None
+_compiled = None
+_byte_map = None
+
+
+def _attach(name, encoding):
+    global _shared, _compiled, _byte_map
+    _shared = shared_memory.SharedMemory(name=name)
+    _compiled = CompiledDFA.from_buffer(_shared.buf)
+    _byte_map = _compiled.byte_map(encoding)
+
+
+def chunk_map(compiled: CompiledDFA, buffer, byte_map) -> list[int]:
+    """
+    list state -> state reached after reading the whole of :buffer from that state
+
+    every distinct start state is a plain `run_bytes` over a block of the buffer, start states
+    that reach the same state are merged after each block, so the cost is at most one
+    sequential run per start state that never converges; blocks start small and double,
+    converging states are merged early and the check costs nothing on long blocks,
+    the dead state always maps to itself and is not run
+    """
+    dead = compiled.dead_state
+    # current holds distinct states, origin[state] is the index in current that state has become
+    current = [state for state in range(compiled.num_states) if state != dead]
+    origin = list(range(len(current)))
+
+    with memoryview(buffer) as view:
+        position = 0
+        block_size = MIN_MERGE_BLOCK
+        while position < len(view) and current:
+            block = view[position:position + block_size]
+            reached = [compiled.run_bytes(block, state, byte_map) for state in current]
+            block.release()
+            position += block_size
+            block_size = min(block_size * 2, MAX_MERGE_BLOCK)
+
+            merged = dict.fromkeys(reached)
+            if len(merged) < len(reached):
+                index = {state: i for i, state in enumerate(merged)}
+                origin = [index[reached[i]] for i in origin]
+                current = list(merged)
+            else:
+                current = reached
+
+            if len(current) == 1:
+                current = [compiled.run_bytes(view[position:], current[0], byte_map)]
+                break
+
+    # the dead state is the last one
+    return [current[i] for i in origin] + [dead]
+
+
+def _scan_chunk(path, start, end) -> list[int]:
+    # mmap offsets have to be multiples of the allocation granularity
+    offset = start - start % mmap.ALLOCATIONGRANULARITY
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), end - offset, access=mmap.ACCESS_READ, offset=offset) as mm:
+        with memoryview(mm) as view:
+            return chunk_map(_compiled, view[start - offset:], _byte_map)
+
+
+def run_file_parallel(compiled: CompiledDFA, path, encoding='utf-8', workers=None, chunk_size=None) -> int:
+    """
+    state reached after reading the whole file at :path, the file is split into chunks
+    that are mapped (state -> state) in a process pool, the maps are composed in file order
+
+    workers attach to one copy of the table in shared memory (the binary format of
+    `CompiledDFA.to_bytes`) and memory-map their own range of the file
+
+    falls back to a sequential run when the file is a single chunk or when the alphabet
+    has symbols that are not single bytes in :encoding (chunks could split them)
+    """
+    byte_map = compiled.byte_map(encoding)
+    size = os.path.getsize(path)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(MIN_CHUNK_SIZE, math.ceil(size / (workers * CHUNKS_PER_WORKER)))
+
+    if byte_map is None or size <= chunk_size:
+        return _run_sequential(compiled, path, encoding)
+
+    data = compiled.to_bytes()
+    shared = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        shared.buf[:len(data)] = data
+        state = compiled.initial_state
+        with ProcessPoolExecutor(workers, initializer=_attach, initargs=(shared.name, encoding)) as pool:
+            futures = [
+                pool.submit(_scan_chunk, path, start, min(start + chunk_size, size))
+                for start in range(0, size, chunk_size)
+            ]
+            for future in futures:
+                state = future.result()[state]
+                if state == compiled.dead_state:
+                    pool.shutdown(cancel_futures=True)
+                    break
+        return state
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def _run_sequential(compiled: CompiledDFA, path, encoding) -> int:
+    matcher = StreamMatcher(compiled, encoding=encoding)
+    with open(path, 'rb') as f:
+        while not matcher.is_dead():
+            block = f.read(MIN_CHUNK_SIZE)
+            if not block:
+                break
+            matcher.feed(block)
+    matcher.close()
+    return matcher.state
+
+
+def match_file_parallel(compiled: CompiledDFA, path, encoding='utf-8', workers=None, chunk_size=None) -> bool:
+    """ whether the whole content of the file is accepted, see run_file_parallel """
+    return compiled.is_final(run_file_parallel(compiled, path, encoding, workers, chunk_size))
@@ -0,0 +1,109 @@
+from array import array
+from compiled_dfa import CompiledDFA
+
+
+class PatternSet:
+    """
+    matches a string against many patterns (regexes or DFAs) in one pass
+
+    every pattern is minified and compiled, then the n-ary product of the compiled
+    tables is built over the union of their alphabets, a product state is the tuple
+    of component states and carries the bitmask of the patterns it accepts, so a scan
+    costs one table lookup per symbol whatever the number of patterns
+
+    pattern ids are the positions in :patterns
+    """
+
+    def __init__(self, patterns, method='thompson'):
+        from dfa import DFA
+
+        components = []
+        for pattern in patterns:
+            if isinstance(pattern, str):
+                pattern = DFA.from_regex(pattern, method=method)
+            components.append(pattern.minify(retain_names=False).compile())
+        if not components:
+            raise ValueError('PatternSet needs at least one pattern')
+        self.components = components
+
+        symbols = set()
+        for component in components:
+            symbols.update(component.symbols)
+        symbols = tuple(sorted(symbols, key=str))
+        stride = len(symbols) + 1
+
+        # columns[i][symbol id] = column of that symbol in the table of component i
+        columns = [
+            [component.symbol_ids.get(symbol, component.unknown_symbol) for symbol in symbols]
+            for component in components
+        ]
+
+        dead = tuple(component.dead_state for component in components)
+        initial = tuple(component.initial_state for component in components)
+        state_ids = {initial: 0}
+        states = [initial]
+        rows = []
+        i = 0
+        while i < len(states):
+            state = states[i]
+            i += 1
+            row = [None] * stride
+            for symbol_id in range(len(symbols)):
+                next_state = tuple(
+                    component.table[component_state * component.stride + column[symbol_id]]
+                    for component, column, component_state in zip(components, columns, state)
+                )
+                if next_state == dead:
+                    continue
+                next_id = state_ids.get(next_state)
+                if next_id is None:
+                    next_id = state_ids[next_state] = len(states)
+                    states.append(next_state)
+                row[symbol_id] = next_id
+            rows.append(row)
+
+        # the tuple of dead component states is the product dead state and comes last,
+        # it is also what an unknown symbol leads to
+        dead_state = len(states)
+        rows.append([None] * stride)
+
+        # accept_masks[state] has bit i set when pattern i accepts in that state
+        self.accept_masks = []
+        for state in states:
+            mask = 0
+            for pattern_id, (component, component_state) in enumerate(zip(components, state)):
+                if component.is_final(component_state):
+                    mask |= 1 << pattern_id
+            self.accept_masks.append(mask)
+        self.accept_masks.append(0)
+
+        final_bitmap = bytearray((dead_state + 8) // 8)
+        for state_id, mask in enumerate(self.accept_masks):
+            if mask:
+                final_bitmap[state_id >> 3] |= 1 << (state_id & 7)
+
+        table = array('i', [dead_state if next_id is None else next_id for row in rows for next_id in row])
+        self.compiled = CompiledDFA(table, symbols, final_bitmap)
+
+    def __len__(self):
+        return len(self.components)
+
+    def match_mask(self, input_str) -> int:
+        """ bitmask of the ids of the patterns that accept :input_str """
+        return self.accept_masks[self.compiled.run(input_str)]
+
+    def match(self, input_str) -> list[int]:
+        """ ids of the patterns that accept :input_str, in increasing order """
+        mask = self.match_mask(input_str)
+        ids = []
+        while mask:
+            low_bit = mask & -mask
+            ids.append(low_bit.bit_length() - 1)
+            mask ^= low_bit
+        return ids
+
+    def matches_any(self, input_str) -> bool:
+        return self.compiled.accept_input(input_str)
+
+    def match_many(self, strings) -> list[list[int]]:
+        return [self.match(string) for string in strings]
@@ -0,0 +1,84 @@
+from Regex import Regex
+
+
+class RegexNode:
+    """ base class of the nodes of a parsed regular expression """
+    __slots__ = ()
+
+
+class Symbol(RegexNode):
+    __slots__ = ('symbol',)
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def __repr__(self):
+        return f'Symbol({self.symbol!r})'
+
+
+class Union(RegexNode):
+    __slots__ = ('left', 'right')
+
+    def __init__(self, left: RegexNode, right: RegexNode):
+        self.left = left
+        self.right = right
+
+    def __repr__(self):
+        return f'Union({self.left!r}, {self.right!r})'
+
+
+class Concat(RegexNode):
+    __slots__ = ('left', 'right')
+
+    def __init__(self, left: RegexNode, right: RegexNode):
+        self.left = left
+        self.right = right
+
+    def __repr__(self):
+        return f'Concat({self.left!r}, {self.right!r})'
+
+
+class Star(RegexNode):
+    __slots__ = ('child',)
+
+    def __init__(self, child: RegexNode):
+        self.child = child
+
+    def __repr__(self):
+        return f'Star({self.child!r})'
+
+
+class RegexParser(Regex):
+    """ same grammar and errors as Regex, but the operators build a RegexNode tree instead of an NFA """
+
+    def base_struct(self, input_symbol):
+        return Symbol(input_symbol)
+
+    def plus_struct(self, a, b):
+        return Union(a, b)
+
+    def dot_struct(self, a, b):
+        return Concat(a, b)
+
+    def star_struct(self, a):
+        return Star(a)
+
+    def _finish(self, fragment, language):
+        self.nfa = None
+        self.ast = fragment
+        self.language = language
+
+
+def parse(regex: str) -> tuple[RegexNode, set]:
+    """ returns the syntax tree of :regex and the set of symbols it uses """
+    parser = RegexParser(regex)
+    return parser.ast, parser.language
+
+
+def children(node: RegexNode) -> tuple:
+    if isinstance(node, (Union, Concat)):
+        return node.left, node.right
+    if isinstance(node, Star):
+        return (node.child,)
+    return ()
+
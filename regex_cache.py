@@ -0,0 +1,81 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 512
+
+
+class RegexCache:
+    """
+    LRU cache of compiled regexes, like the pattern cache of `re`
+    keys are (pattern, compile options), values are the compiled automata
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            if self.maxsize <= 0:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def _evict(self):
+        while len(self._entries) > max(self.maxsize, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def set_maxsize(self, maxsize: int):
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def purge(self):
+        """ drops every entry, the counters are kept """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# process-wide cache used by DFA.from_regex
+regex_cache = RegexCache()
+
+
+def purge():
+    regex_cache.purge()
+
+
+def set_maxsize(maxsize: int):
+    regex_cache.set_maxsize(maxsize)
+
+
+def cache_info() -> dict:
+    return regex_cache.stats()
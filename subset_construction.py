@@ -0,0 +1,143 @@
+from collections import deque
+
+EPSILON = ''
+
+
+def epsilon_closure_table(transitions: dict, states=()) -> dict:
+    """
+    {state: frozenset of the states reachable over epsilon ('') transitions, state included}
+    for :states and every state named in :transitions
+
+    the epsilon graph is condensed into strongly connected components (iterative Tarjan),
+    components come out sinks first, so each closure is its component plus the
+    already computed closures of its successors, one pass in topological order
+    """
+    def epsilon_successors(state):
+        return transitions.get(state, {}).get(EPSILON, ())
+
+    nodes = dict.fromkeys(states)
+    for state, row in transitions.items():
+        nodes[state] = None
+        for next_states in row.values():
+            nodes.update(dict.fromkeys(next_states))
+
+    index = dict()
+    low = dict()
+    stack = []
+    on_stack = set()
+    closures = dict()
+
+    for root in nodes:
+        if root in index:
+            continue
+
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(epsilon_successors(root)))]
+
+        while work:
+            node, successors = work[-1]
+            for next_state in successors:
+                if next_state not in index:
+                    index[next_state] = low[next_state] = len(index)
+                    stack.append(next_state)
+                    on_stack.add(next_state)
+                    work.append((next_state, iter(epsilon_successors(next_state))))
+                    break
+                if next_state in on_stack:
+                    low[node] = min(low[node], index[next_state])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+
+                    closure = set(component)
+                    for member in component:
+                        for next_state in epsilon_successors(member):
+                            if next_state not in closure:
+                                closure |= closures[next_state]
+
+                    closure = frozenset(closure)
+                    for member in component:
+                        closures[member] = closure
+
+    return closures
+
+
+def determinize(initial_states, inputs, transitions: dict, final_states, complete=True, closures=None):
+    """
+    worklist subset construction shared by DFA.from_nfa and NFA.nfa_to_dfa
+
+    :transitions is {state: {symbol: iterable of next states}} with '' for epsilon,
+    :closures is an epsilon closure table (see epsilon_closure_table), built here if not given,
+    every subset is looked up in a hash index (frozenset -> DFA state id),
+    so each one is built once, DFA states are numbered from 0 (the initial subset)
+    with :complete the empty subset is kept as a dead state, otherwise those transitions are left out
+
+    returns (states, transitions, final_states) of the DFA
+    """
+    if closures is None:
+        closures = epsilon_closure_table(transitions, initial_states)
+    symbols = [symbol for symbol in inputs if symbol != EPSILON]
+
+    # moves[state][symbol] = closure of the states reached from state on symbol, built on first use
+    moves = dict()
+
+    def move(state):
+        state_moves = moves.get(state)
+        if state_moves is None:
+            state_moves = moves[state] = dict()
+            state_transitions = transitions.get(state, {})
+            for symbol in symbols:
+                reached = set()
+                for next_state in state_transitions.get(symbol, ()):
+                    reached |= closures[next_state]
+                if reached:
+                    state_moves[symbol] = reached
+        return state_moves
+
+    initial_subset = set()
+    for state in initial_states:
+        initial_subset |= closures[state]
+    initial_subset = frozenset(initial_subset)
+
+    subset_ids = {initial_subset: 0}
+    subsets = [initial_subset]
+    dfa_transitions = dict()
+    worklist = deque([initial_subset])
+
+    while worklist:
+        subset = worklist.popleft()
+        row = dfa_transitions.setdefault(subset_ids[subset], dict())
+
+        for symbol in symbols:
+            reached = set()
+            for state in subset:
+                reached.update(move(state).get(symbol, ()))
+
+            if not reached and not complete:
+                continue
+
+            reached = frozenset(reached)
+            reached_id = subset_ids.get(reached)
+            if reached_id is None:
+                reached_id = subset_ids[reached] = len(subsets)
+                subsets.append(reached)
+                worklist.append(reached)
+            row[symbol] = reached_id
+
+    dfa_final_states = {
+        subset_id for subset, subset_id in subset_ids.items() if not final_states.isdisjoint(subset)
+    }
+    return set(range(len(subsets))), dfa_transitions, dfa_final_states
@@ -1,33 +1,70 @@
 from unittest import TestCase, expectedFailure
 import dfa
 import unittest
+import itertools
+import os
+import tempfile
+import subprocess
+import sys
+import re
+import random
+import nfa
+import Regex
 import exceptions
+from lazy_product import LazyProductDFA
+from compiled_dfa import CompiledDFA
+from lazy_dfa import LazyDFA
+from regex_cache import RegexCache
+from pattern_set import PatternSet
+from lexer import Lexer, Token
+import regex_cache
+from benchmarks import generators, runner
+
+
+def ten_state_dfa():
+    """ the DFA of Phase1Test, 10 states that minify to 5 """
+    states = {'q0', 'q1', 'q2', 'q3', 'q4', 'q5', 'q6', 'q7', 'q8', 'q9'}
+    inputs = {'a', 'b'}
+    transitions = {
+        'q0': {'a': 'q1', 'b': 'q9'},
+        'q1': {'a': 'q8', 'b': 'q2'},
+        'q2': {'a': 'q3', 'b': 'q2'},
+        'q3': {'a': 'q2', 'b': 'q4'},
+        'q4': {'a': 'q5', 'b': 'q8'},
+        'q5': {'a': 'q4', 'b': 'q5'},
+        'q6': {'a': 'q7', 'b': 'q5'},
+        'q7': {'a': 'q6', 'b': 'q5'},
+        'q8': {'a': 'q1', 'b': 'q3'},
+        'q9': {'a': 'q7', 'b': 'q8'},
+    }
+    initial_state = 'q0'
+    final_states = {'q3', 'q4', 'q9', 'q8'}
+    return dfa.DFA(states, inputs, transitions, final_states, initial_state)
+
+
+def partial_dfa():
+    """ 4 states, some transitions missing and q3 unreachable """
+    return dfa.DFA(
+        states={'q0', 'q1', 'q2', 'q3'},
+        inputs={'a', 'b'},
+        transitions={
+            'q0': {'a': 'q1', 'b': 'q0'},
+            'q1': {'a': 'q2'},
+            'q2': {'a': 'q2', 'b': 'q1'},
+            'q3': {'a': 'q0', 'b': 'q3'},
+        },
+        initial_state='q0',
+        final_states={'q2', 'q3'}
+    )
 
 
 class Phase1Test(TestCase):
     def setUp(self) -> None:
-        states = {'q0', 'q1', 'q2', 'q3', 'q4', 'q5', 'q6', 'q7', 'q8', 'q9'}
-        inputs = {'a', 'b'}
-        transitions = {
-                          'q0': {'a': 'q1', 'b': 'q9'},
-                          'q1': {'a': 'q8', 'b': 'q2'},
-                          'q2': {'a': 'q3', 'b': 'q2'},
-                          'q3': {'a': 'q2', 'b': 'q4'},
-                          'q4': {'a': 'q5', 'b': 'q8'},
-                          'q5': {'a': 'q4', 'b': 'q5'},
-                          'q6': {'a': 'q7', 'b': 'q5'},
-                          'q7': {'a': 'q6', 'b': 'q5'},
-                          'q8': {'a': 'q1', 'b': 'q3'},
-                          'q9': {'a': 'q7', 'b': 'q8'},
-                      }
-        initial_state = 'q0'
-        final_states = {'q3', 'q4', 'q9', 'q8'}
-
         self.strings_belong_to_dfa = ['abaaa', 'bb', 'aababab']
         self.is_empty = False
         self.is_finite = False
 
-        self.dfa = dfa.DFA(states, inputs, transitions, final_states, initial_state)
+        self.dfa = ten_state_dfa()
 
     def test_accepting_string(self):
         accepted = []
@@ -69,4 +106,578 @@ class Phase1Test(TestCase):
         pass
 
     def test_complement(self):
-        pass
\ No newline at end of file
+        pass
+
+
+class CompiledDFATest(TestCase):
+    def setUp(self) -> None:
+        self.dfa = partial_dfa()
+        self.words = [''.join(w) for n in range(6) for w in itertools.product('abc', repeat=n)]
+
+    def test_table_layout(self):
+        compiled = self.dfa.compile()
+        self.assertEqual(compiled.num_states, 5)
+        self.assertEqual(compiled.symbols, ('a', 'b'))
+        self.assertEqual(compiled.state_name(compiled.initial_state), 'q0')
+        self.assertIsNone(compiled.state_name(compiled.dead_state))
+        self.assertFalse(compiled.is_final(compiled.dead_state))
+
+    def test_matches_accept_input(self):
+        compiled = self.dfa.compile()
+        for word in self.words:
+            self.assertEqual(compiled.accept_input(word), self.dfa.accept_input(word), word)
+
+    def test_accept_many(self):
+        expected = [self.dfa.accept_input(word) for word in self.words]
+        self.assertEqual(self.dfa.accept_many(self.words), expected)
+
+        # padded rows of symbol ids with a length array
+        compiled = self.dfa.compile()
+        width = max(len(word) for word in self.words)
+        padded = [list(compiled.encode(word)) + [0] * (width - len(word)) for word in self.words]
+        lengths = [len(word) for word in self.words]
+        self.assertEqual(compiled.accept_many(padded, lengths), expected)
+
+        # bytes are decoded like read_inputs does
+        accented = dfa.DFA({0, 1}, {'é'}, {0: {'é': 1}}, {1}, 0)
+        self.assertEqual(accented.accept_many(['é'.encode(), b'e']), [True, False])
+        self.assertEqual(accented.accept_many(['é'.encode('latin-1')], encoding='latin-1'), [True])
+        self.assertTrue(accented.read_inputs('é'.encode()).is_accepted())
+
+    def test_stream_matcher(self):
+        for word in self.words:
+            matcher = self.dfa.read_inputs()
+            for i in range(0, len(word), 2):
+                matcher.feed(word[i:i + 2])
+            self.assertEqual(matcher.is_accepted(), self.dfa.accept_input(word), word)
+
+        matcher = self.dfa.read_inputs(b'a')
+        matcher.feed(b'a')
+        self.assertTrue(matcher.is_accepted())
+        matcher.feed('b')
+        self.assertFalse(matcher.is_accepted())
+        matcher.feed('é'.encode()[:1])
+        self.assertFalse(matcher.is_dead())
+        matcher.feed('é'.encode()[1:])
+        self.assertTrue(matcher.is_dead())
+        self.assertFalse(matcher.close())
+
+    def test_match_and_scan_file(self):
+        lines = ['aa', 'ab', '', 'aab', 'bbaa', 'c', 'baab']
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'input.txt')
+            with open(path, 'w') as f:
+                f.write('\n'.join(lines))
+
+            offsets, offset = [], 0
+            for line in lines:
+                if self.dfa.accept_input(line):
+                    offsets.append(offset)
+                offset += len(line) + 1
+            self.assertEqual(self.dfa.scan_file(path), offsets)
+            self.assertFalse(self.dfa.match_file(path))
+
+            with open(path, 'w') as f:
+                f.write('baaa')
+            self.assertTrue(self.dfa.match_file(path))
+
+    def test_match_file_other_encodings(self):
+        # bytes of these encodings are not the characters of the same code, they have to be decoded
+        self.assertIsNone(self.dfa.compile().byte_map('utf-16-le'))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'input.txt')
+            for encoding in ('utf-16-le', 'utf-16', 'cp037'):
+                with open(path, 'wb') as f:
+                    f.write('baaa'.encode(encoding))
+                self.assertTrue(self.dfa.match_file(path, encoding=encoding), encoding)
+                self.assertTrue(self.dfa.read_inputs('baaa'.encode(encoding), encoding=encoding).close())
+
+                with open(path, 'wb') as f:
+                    f.write('aa\nb\n\nbaa\n'.encode(encoding))
+                self.assertEqual(self.dfa.scan_file(path, encoding=encoding),
+                                 [0, len('aa\nb\n\n'.encode(encoding))], encoding)
+
+    def test_binary_format(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'table.cdfa')
+            self.dfa.save(path)
+            loaded = CompiledDFA.load(path)
+            try:
+                self.assertIsNone(loaded.state_names)
+                self.assertEqual(loaded.symbols, ('a', 'b'))
+                for word in self.words:
+                    self.assertEqual(loaded.accept_input(word), self.dfa.accept_input(word), word)
+                self.assertEqual(loaded.accept_many(self.words), self.dfa.accept_many(self.words))
+            finally:
+                loaded.close()
+
+        compiled = self.dfa.compile()
+        copy = CompiledDFA.from_buffer(compiled.to_bytes())
+        self.assertEqual(list(copy.table), list(compiled.table))
+        self.assertRaises(ValueError, CompiledDFA.from_buffer, b'\0' * 64)
+        data = compiled.to_bytes()
+        for size in (0, 10, len(data) - 9, len(data) - 1):
+            self.assertRaises(ValueError, CompiledDFA.from_buffer, data[:size])
+
+    def test_parallel_match_file(self):
+        import parallel_scan
+
+        compiled = self.dfa.compile()
+        for buffer in (b'', b'ab', b'abab', b'aba', b'bba', b'ba' * 500 + b'a', b'b' * 300 + b'a' * 2):
+            expected = [compiled.run(buffer.decode(), state) for state in range(compiled.num_states)]
+            self.assertEqual(parallel_scan.chunk_map(compiled, buffer, compiled.byte_map()), expected, buffer)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'input.txt')
+            for content in ('baa' + 'ab' * 40 + 'a', 'ab' * 40 + 'c' + 'aa'):
+                with open(path, 'w') as f:
+                    f.write(content)
+                self.assertEqual(
+                    self.dfa.match_file_parallel(path, workers=2, chunk_size=7),
+                    self.dfa.accept_input(content), content
+                )
+            self.assertEqual(self.dfa.match_file_parallel(path), self.dfa.match_file(path))
+
+
+class MinimizationTest(TestCase):
+    def setUp(self) -> None:
+        self.dfa = ten_state_dfa()
+
+    def test_minify(self):
+        words = [''.join(w) for n in range(8) for w in itertools.product('ab', repeat=n)]
+        for retain_names in (True, False):
+            minimized = self.dfa.minify(retain_names=retain_names)
+            self.assertEqual(len(minimized.states), 5)
+            for word in words:
+                self.assertEqual(minimized.accept_input(word), self.dfa.accept_input(word), word)
+
+        minimized = self.dfa.minify(retain_names=False)
+        self.assertEqual(minimized.initial_state, 0)
+        self.assertEqual(minimized.states, set(range(5)))
+        self.assertIn(frozenset({'q3', 'q4', 'q8'}), self.dfa.minify().final_states)
+
+
+class LazyProductTest(TestCase):
+    def setUp(self) -> None:
+        self.dfa = ten_state_dfa()
+        self.other = partial_dfa()
+        self.words = [''.join(w) for n in range(7) for w in itertools.product('ab', repeat=n)]
+
+    def test_matches_eager_product(self):
+        for operation in ('union', 'intersection', 'difference'):
+            eager = getattr(dfa.DFA, operation)(self.dfa, self.other)
+            lazy = getattr(dfa.DFA, operation)(self.dfa, self.other, lazy=True, cache_size=3)
+            for word in self.words:
+                self.assertEqual(lazy.accept_input(word), eager.accept_input(word), (operation, word))
+            self.assertLessEqual(lazy.cache_info()['states'], 3)
+            self.assertEqual(lazy.is_empty(), eager.is_empty())
+
+            materialized = getattr(self.dfa, operation)(self.other, lazy=True).materialize()
+            for word in self.words:
+                self.assertEqual(materialized.accept_input(word), eager.accept_input(word), (operation, word))
+
+    def test_nested_product(self):
+        inner = self.dfa.intersection(self.other, lazy=True)
+        lazy = LazyProductDFA(inner, self.dfa, LazyProductDFA.UNION)
+        self.assertFalse(lazy.is_empty())
+        for word in self.words:
+            self.assertEqual(lazy.accept_input(word), self.dfa.accept_input(word), word)
+
+    def test_inclusion_and_disjointness_witnesses(self):
+        self.assertTrue(self.dfa.is_subset(self.dfa.union(self.other)))
+        self.assertFalse(dfa.DFA.is_subset(self.dfa, self.other))
+
+        counterexample = self.dfa.subset_counterexample(self.other)
+        self.assertEqual(counterexample, 'b')
+        self.assertTrue(self.dfa.accept_input(counterexample))
+        self.assertFalse(self.other.accept_input(counterexample))
+
+        witness = dfa.DFA.disjoint_witness(self.dfa, self.other)
+        self.assertEqual(witness, 'aa')
+        self.assertFalse(self.dfa.is_disjoint(self.other))
+        self.assertTrue(self.dfa.is_disjoint(self.dfa.complement()))
+        self.assertIsNone(self.dfa.disjoint_witness(self.dfa.complement()))
+
+
+class LanguageSizeTest(TestCase):
+    def setUp(self) -> None:
+        # all words of length 2 plus the empty word, q3 is a dead state with a loop
+        self.dfa = dfa.DFA(
+            states={'q0', 'q1', 'q2', 'q3'},
+            inputs={'a', 'b'},
+            transitions={
+                'q0': {'a': 'q1', 'b': 'q1'},
+                'q1': {'a': 'q2', 'b': 'q2'},
+                'q2': {'a': 'q3', 'b': 'q3'},
+                'q3': {'a': 'q3', 'b': 'q3'},
+            },
+            initial_state='q0',
+            final_states={'q0', 'q2'}
+        )
+
+    def test_word_counts(self):
+        self.assertEqual(self.dfa.word_counts(), {0: 1, 2: 4})
+        self.assertEqual(len(self.dfa), 5)
+
+    def test_infinite_language(self):
+        self.assertRaises(exceptions.InfiniteLanguageException, len, self.dfa.complement())
+
+    def test_word_lengths(self):
+        self.assertTrue(self.dfa.is_finite())
+        self.assertEqual(self.dfa.shortest_word_length(), 0)
+        self.assertEqual(self.dfa.longest_word_length(), 2)
+
+        complement = self.dfa.complement()
+        self.assertFalse(complement.is_finite())
+        self.assertEqual(complement.shortest_word_length(), 1)
+        self.assertIsNone(complement.longest_word_length())
+
+        empty = dfa.DFA(self.dfa.states, self.dfa.inputs, self.dfa.transitions, set(), 'q0')
+        self.assertTrue(empty.is_finite())
+        self.assertRaises(exceptions.EmptyLanguageException, empty.shortest_word_length)
+
+    def test_trim(self):
+        self.dfa.states.add('q4')
+        self.dfa.transitions['q4'] = {'a': 'q0', 'b': 'q4'}
+        trimmed = self.dfa.trim()
+        self.assertEqual(trimmed.states, {'q0', 'q1', 'q2'})
+        self.assertEqual(trimmed.transitions['q2'], {})
+        for n in range(5):
+            for word in map(''.join, itertools.product('ab', repeat=n)):
+                self.assertEqual(trimmed.accept_input(word), self.dfa.accept_input(word), word)
+
+        empty = dfa.DFA(self.dfa.states, self.dfa.inputs, self.dfa.transitions, set(), 'q0').trim()
+        self.assertEqual((empty.states, empty.final_states), ({'q0'}, set()))
+
+        # a long chain, the old recursive co-reachability check hit the recursion limit here
+        n = 2000
+        chain = dfa.DFA(set(range(n)), {'a'}, {state: {'a': state + 1} for state in range(n - 1)}, {n - 1}, 0)
+        self.assertEqual(len(chain.trim().states), n)
+        self.assertEqual(dfa.DFA.to_regex(chain), 'a' * (n - 1))
+
+
+class ImportTimeTest(TestCase):
+    # budget for a cold `import dfa` in a fresh interpreter, best of a few runs to smooth out noise
+    IMPORT_BUDGET_MS = 25
+    HEAVY_MODULES = ('typing', 'networkx', 'Regex', 'nfa', 'dfa_to_regex', 'subset_construction')
+
+    def test_import_budget(self):
+        code = (
+            'import sys, time\n'
+            'start = time.perf_counter()\n'
+            'import dfa\n'
+            'print((time.perf_counter() - start) * 1000)\n'
+            f'print(" ".join(name for name in {self.HEAVY_MODULES!r} if name in sys.modules))\n'
+        )
+        timings = []
+        for _ in range(3):
+            output = subprocess.run(
+                [sys.executable, '-c', code],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                capture_output=True, text=True, check=True
+            ).stdout.split('\n')
+            timings.append(float(output[0]))
+            self.assertEqual(output[1], '', 'modules imported eagerly by dfa')
+
+        self.assertLess(min(timings), self.IMPORT_BUDGET_MS)
+
+
+class ConstructionTest(TestCase):
+    def setUp(self) -> None:
+        self.words = [''.join(w) for n in range(7) for w in itertools.product('ab', repeat=n)]
+
+    @staticmethod
+    def example_nfa():
+        return nfa.NFA(
+            states={'q0', 'q1', 'q2'},
+            transitions={
+                'q0': {'a': {'q1'}},
+                'q1': {'a': {'q1'}, '': {'q2'}},
+                'q2': {'b': {'q0'}}
+            },
+            inputs={'a', 'b'},
+            initial_state={'q0'},
+            final_states={'q1'}
+        )
+
+    def test_from_nfa(self):
+        expected = {word for word in self.words if re.fullmatch('(a+b)*a+', word)}
+        for minify in (False, True):
+            converted = dfa.DFA.from_nfa(self.example_nfa(), minify=minify)
+            self.assertEqual(converted.initial_state, 0)
+            self.assertEqual({word for word in self.words if converted.accept_input(word)}, expected)
+
+    def test_from_regex(self):
+        patterns = {
+            '(a+b)*ab': '(a|b)*ab', '(ab+b)*a*': '(ab|b)*a*', 'a*b*': 'a*b*',
+            'ab+ba': 'ab|ba', '((a*b)*+b(ab)*)*a': '((a*b)*|b(ab)*)*a'
+        }
+        for method in ('thompson', 'glushkov'):
+            for pattern, python_pattern in patterns.items():
+                converted = dfa.DFA.from_regex(pattern, method=method)
+                for word in self.words:
+                    expected = bool(re.fullmatch(python_pattern, word))
+                    self.assertEqual(converted.accept_input(word), expected, (method, pattern, word))
+
+        self.assertRaises(ValueError, dfa.DFA.from_regex, 'ab', method='derivatives')
+
+    def test_bitset_nfa_simulation(self):
+        example = self.example_nfa()
+        converted = dfa.DFA.from_nfa(self.example_nfa())
+        for word in self.words:
+            self.assertEqual(example.accepts(word), converted.accept_input(word), word)
+
+        # (a+b)*a(a+b)^12 would need 2^13 DFA states
+        regex_nfa = Regex.Regex('(a+b)*a' + '(a+b)' * 12).nfa
+        self.assertTrue(regex_nfa.accepts('bbba' + 'b' * 12))
+        self.assertFalse(regex_nfa.accepts('bbba' + 'b' * 11))
+        self.assertFalse(regex_nfa.accepts('ab' * 8))
+        self.assertFalse(regex_nfa.accepts('abc' * 8))
+
+    def test_lazy_dfa(self):
+        pattern = '(a+b)*a(a+b)(a+b)(a+b)'
+        lazy = LazyDFA.from_regex(pattern, max_states=4)
+        for word in self.words:
+            self.assertEqual(lazy.accepts(word), bool(re.fullmatch('(a|b)*a(a|b){3}', word)), word)
+
+        stats = lazy.stats()
+        self.assertLessEqual(stats['states'], 4)
+        self.assertGreater(stats['hits'], 0)
+        self.assertGreater(stats['evictions'], 0)
+
+        roomy = LazyDFA.from_regex(pattern, max_states=64)
+        for word in self.words:
+            roomy.accepts(word)
+        self.assertEqual(roomy.stats()['evictions'], 0)
+        self.assertEqual(roomy.stats()['states'], len(dfa.DFA.from_regex(pattern).states))
+
+    def test_epsilon_closure_table(self):
+        cyclic = nfa.NFA(
+            states={0, 1, 2, 3},
+            transitions={0: {'': {1}}, 1: {'': {0, 2}, 'a': {3}}, 2: {'b': {2}}, 3: {}},
+            inputs={'a', 'b'},
+            initial_state={0},
+            final_states={2}
+        )
+        closures = cyclic.epsilon_closures()
+        self.assertEqual(closures[0], {0, 1, 2})
+        self.assertEqual(closures[1], {0, 1, 2})
+        self.assertEqual(closures[3], {3})
+        self.assertIs(cyclic.epsilon_closures(), closures)
+
+        transitions, final_states = cyclic.eliminate_lambda_closures()
+        self.assertEqual(final_states, {0, 1, 2})
+        self.assertEqual(transitions[0], {'a': {3}, 'b': {2}})
+
+        cyclic.add_transition(3, 0, '')
+        self.assertEqual(cyclic.epsilon_closures()[3], {0, 1, 2, 3})
+
+    def test_thompson_fragments_share_one_nfa(self):
+        # two states per symbol, two per union/star, none per concatenation
+        self.assertEqual(len(Regex.Regex('ab' * 500).nfa.states), 2000)
+        self.assertEqual(len(Regex.Regex('(a+b)*').nfa.states), 8)
+        self.assertTrue(Regex.Regex('(a+b)*ab').nfa.accepts('babab'))
+
+    def test_regex_cache(self):
+        regex_cache.purge()
+        before = regex_cache.cache_info()
+        first = dfa.DFA.from_regex('(a+b)*abb')
+        second = dfa.DFA.from_regex('(a+b)*abb')
+        dfa.DFA.from_regex('(a+b)*abb', method='glushkov')
+        after = regex_cache.cache_info()
+        self.assertEqual(after['misses'] - before['misses'], 2)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['size'], 2)
+
+        # callers get independent copies
+        self.assertIsNot(first, second)
+        first.transitions.clear()
+        self.assertTrue(dfa.DFA.from_regex('(a+b)*abb').accept_input('babb'))
+
+        cache = RegexCache(maxsize=2)
+        for key in ('a', 'b', 'a', 'c'):
+            if cache.get(key) is None:
+                cache.put(key, key.upper())
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'A')
+        cache.purge()
+        self.assertEqual(len(cache), 0)
+
+
+class PatternSetTest(TestCase):
+    def setUp(self) -> None:
+        self.dfa = partial_dfa()
+        self.patterns = ['(a+b)*abb', 'a*b*', 'ab(a+b)*', '(ab)*', 'c(a+c)*']
+        self.dfas = [dfa.DFA.from_regex(pattern) for pattern in self.patterns]
+        self.words = [''.join(w) for n in range(6) for w in itertools.product('abc', repeat=n)]
+
+    def test_match(self):
+        pattern_set = PatternSet(self.patterns)
+        self.assertEqual(len(pattern_set), len(self.patterns))
+        for word in self.words:
+            expected = [i for i, automaton in enumerate(self.dfas) if automaton.accept_input(word)]
+            self.assertEqual(pattern_set.match(word), expected, word)
+            self.assertEqual(pattern_set.matches_any(word), bool(expected), word)
+        self.assertEqual(pattern_set.match('abd'), [])
+
+    def test_mixed_patterns(self):
+        pattern_set = PatternSet([self.dfas[0], 'b', self.dfa])
+        self.assertEqual(pattern_set.match('abb'), [0])
+        self.assertEqual(pattern_set.match('b'), [1])
+        self.assertEqual(pattern_set.match('aa'), [2])
+        self.assertRaises(ValueError, PatternSet, [])
+
+
+class SearchTest(TestCase):
+    def setUp(self) -> None:
+        self.patterns = ['ab*', '(a+b)*abb', 'a*', 'ba+c', 'aa*b']
+        self.texts = [''.join(w) for n in range(7) for w in itertools.product('abcd', repeat=n)][::7]
+
+    @staticmethod
+    def leftmost_longest(automaton, text):
+        spans, position = [], 0
+        while position <= len(text):
+            for start in range(position, len(text) + 1):
+                ends = [end for end in range(start, len(text) + 1) if automaton.accept_input(text[start:end])]
+                if ends:
+                    spans.append((start, ends[-1]))
+                    position = ends[-1] if ends[-1] > start else ends[-1] + 1
+                    break
+            else:
+                break
+        return spans
+
+    def test_leftmost_longest(self):
+        for pattern in self.patterns:
+            automaton = dfa.DFA.from_regex(pattern)
+            searcher = automaton.searcher()
+            for text in self.texts:
+                expected = self.leftmost_longest(automaton, text)
+                self.assertEqual(list(searcher.finditer(text)), expected, (pattern, text))
+                self.assertEqual(searcher.search(text), expected[0] if expected else None)
+
+    def test_all_ends(self):
+        for pattern in self.patterns:
+            automaton = dfa.DFA.from_regex(pattern)
+            searcher = automaton.searcher()
+            for text in self.texts:
+                expected = []
+                for end in range(len(text) + 1):
+                    starts = [start for start in range(end + 1) if automaton.accept_input(text[start:end])]
+                    if starts:
+                        expected.append((starts[0], end))
+                self.assertEqual(list(searcher.finditer(text, mode='all-ends')), expected, (pattern, text))
+
+    def test_like_re(self):
+        text = 'xxabbbyab-aabb'
+        self.assertEqual(
+            list(dfa.DFA.from_regex('ab*').finditer(text)),
+            [m.span() for m in re.finditer('ab*', text)]
+        )
+        self.assertRaises(ValueError, dfa.DFA.from_regex('ab').search, 'ab', mode='first')
+
+    def test_long_text(self):
+        # no rescans per match, these took seconds when every end or start was scanned again
+        text = 'a' * 20000
+        star = dfa.DFA.from_regex('a*')
+        self.assertEqual(list(star.finditer(text)), [(0, 20000), (20000, 20000)])
+        self.assertEqual(list(star.finditer(text, mode='all-ends')), [(0, end) for end in range(20001)])
+        searcher = dfa.DFA.from_regex('aa*b').searcher()
+        self.assertEqual(list(dfa.DFA.from_regex('aa*b').finditer(text, searcher=searcher)), [])
+        self.assertEqual(list(searcher.finditer(text + 'b')), [(0, 20001)])
+
+
+class LexerTest(TestCase):
+    def setUp(self) -> None:
+        space = dfa.DFA({0, 1}, {' '}, {0: {' ': 1}, 1: {' ': 1}}, {1}, 0)
+        self.lexer = Lexer([
+            ('IF', 'if'),
+            ('NAME', '(i+f+x)(i+f+x+0+1)*'),
+            ('NUMBER', '(0+1)(0+1)*'),
+            ('SPACE', space),
+        ], skip=('SPACE',))
+        self.text = 'if ifx  x1 10if'
+        self.tokens = [
+            Token('IF', 'if', 0), Token('NAME', 'ifx', 3), Token('NAME', 'x1', 8),
+            Token('NUMBER', '10', 11), Token('IF', 'if', 13),
+        ]
+
+    def test_tokenize(self):
+        self.assertEqual(list(self.lexer.tokenize(self.text)), self.tokens)
+        self.assertEqual(list(self.lexer.tokenize('')), [])
+
+    def test_tokenize_stream(self):
+        for size in (1, 2, 3, 7):
+            chunks = [self.text[i:i + size] for i in range(0, len(self.text), size)]
+            self.assertEqual(list(self.lexer.tokenize_stream(chunks)), self.tokens)
+            self.assertEqual(list(self.lexer.tokenize_stream(chunk.encode() for chunk in chunks)), self.tokens)
+
+    def test_errors(self):
+        tokens = self.lexer.tokenize('if 2')
+        self.assertEqual(next(tokens), Token('IF', 'if', 0))
+        self.assertRaises(exceptions.LexerException, next, tokens)
+        self.assertRaises(exceptions.LexerException, Lexer, [('A', 'a*')])
+
+
+class ToRegexTest(TestCase):
+    def setUp(self) -> None:
+        self.words = [''.join(w) for n in range(8) for w in itertools.product('ab', repeat=n)]
+
+    def assertSameLanguage(self, automaton, regex):
+        # '+' and '$' of the output are '|' and the empty group in Python's re
+        pattern = re.compile(regex.replace('+', '|').replace('$', '()'))
+        for word in self.words:
+            self.assertEqual(bool(pattern.fullmatch(word)), automaton.accept_input(word), (regex, word))
+
+    def test_random_dfas(self):
+        r = random.Random(7)
+        for n in (2, 5, 10, 20):
+            for _ in range(10):
+                automaton = dfa.DFA(
+                    set(range(n)), {'a', 'b'},
+                    {state: {symbol: r.randrange(n) for symbol in 'ab'} for state in range(n)},
+                    {state for state in range(n) if r.random() < 0.3}, 0
+                )
+                regex = dfa.DFA.to_regex(automaton)
+                if automaton.is_empty():
+                    self.assertEqual(regex, '')
+                else:
+                    self.assertSameLanguage(automaton, regex)
+
+    def test_simplification(self):
+        self.assertEqual(dfa.DFA.to_regex(dfa.DFA.from_regex('(a+b)*').minify()), '(a+b)*')
+        self.assertEqual(dfa.DFA.to_regex(dfa.DFA({0}, {'a'}, {0: {}}, {0}, 0)), '$')
+        self.assertEqual(dfa.DFA.to_regex(dfa.DFA({0}, {'a'}, {0: {'a': 0}}, set(), 0)), '')
+
+    def test_many_states(self):
+        n = 300
+        automaton = dfa.DFA(
+            set(range(n)), {'a', 'b'},
+            {state: {'a': (state + 1) % n, 'b': state if state % 7 else 0} for state in range(n)},
+            {state for state in range(n) if state % 50 == 0}, 0
+        )
+        self.assertSameLanguage(automaton, dfa.DFA.to_regex(automaton))
+
+
+class BenchmarkTest(TestCase):
+    def test_generators(self):
+        first, second = generators.random_dfa(20, seed=3), generators.random_dfa(20, seed=3)
+        self.assertEqual((first.transitions, first.final_states), (second.transitions, second.final_states))
+        self.assertTrue(generators.random_dfa(50, acyclic=True, seed=3).is_finite())
+        self.assertEqual(generators.random_nfa(20, seed=3).transitions, generators.random_nfa(20, seed=3).transitions)
+
+        for seed in range(5):
+            regex = generators.random_regex(15, seed=seed)
+            self.assertEqual(regex, generators.random_regex(15, seed=seed))
+            self.assertEqual(sum(c in 'ab' for c in regex), 15)
+            dfa.DFA.from_regex(regex, cache=False)
+
+    def test_compare(self):
+        results = runner.run_benchmarks(['minify', 'to_regex'], repeat=1, quick=True)
+        self.assertEqual(set(results['results']), {'minify', 'to_regex'})
+        self.assertEqual(runner.compare(results, results), [])
+
+        slower = {'results': {'minify': {'10': {'min': 1.0, 'median': 1.0}}}}
+        slowdowns = runner.compare(results, slower)
+        self.assertEqual([(s['benchmark'], s['size']) for s in slowdowns], [('minify', '10')])